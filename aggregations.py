@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Layer agregasi untuk halaman Analysis Insights.
+# Filter dan GROUP BY dijalankan di database (atau satu pass vectorized di pandas),
+# sehingga halaman hanya menyimpan tabel agregat yang kecil, bukan seluruh isi spktable.
+
+TABLE_NAME = 'spktable'
+
+# Filter data sama seperti load_data() sebelumnya
+FILTER_SQL = ('"Cholesterol" > 50 AND "Cholesterol" < 350 '
+              'AND "RestingBP" > 90 AND "RestingBP" < 180 '
+              'AND "Oldpeak" >= 0')
+
+# Kolom yang dihitung per nilai dan per status HeartDisease (satu kolom untuk setiap section)
+GROUP_COLUMNS = ['Age', 'MaxHR', 'Sex', 'ChestPainType', 'RestingBP', 'Cholesterol',
+                 'FastingBS', 'RestingECG', 'Oldpeak', 'ExerciseAngina', 'ST_Slope']
+
+HEART_DISEASE_LABELS = {0: 'No', 1: 'Yes'}
+
+
+def _finalize(df, col):
+    df = df.copy()
+    df['HeartDisease'] = df['HeartDisease'].map(HEART_DISEASE_LABELS)
+    df['count'] = df['count'].astype(np.int64)
+    return df.sort_values([col, 'HeartDisease'], ignore_index=True)
+
+
+# Query agregat untuk seluruh kolom dalam satu statement.
+# PostgreSQL: GROUPING SETS (satu scan tabel), kolom yang sedang dihitung dikenali dari bitmask GROUPING().
+# Database lain (misalnya SQLite): UNION ALL dengan nomor kolom pada setiap baris hasil.
+def _aggregate_query(dialect, table, condition):
+    if dialect == 'postgresql':
+        columns = ', '.join(f'"{col}"' for col in GROUP_COLUMNS)
+        sets = ', '.join(f'("{col}", "HeartDisease")' for col in GROUP_COLUMNS)
+        return (f'SELECT GROUPING({columns}), {columns}, "HeartDisease", COUNT(*) FROM {table} '
+                f'WHERE {condition} GROUP BY GROUPING SETS ({sets})')
+    return ' UNION ALL '.join(
+        f'SELECT {i}, "{col}", "HeartDisease", COUNT(*) FROM {table} WHERE {condition} GROUP BY "{col}", "HeartDisease"'
+        for i, col in enumerate(GROUP_COLUMNS))
+
+
+# Fungsi untuk mengubah baris hasil _aggregate_query menjadi (index kolom, nilai, HeartDisease, count)
+def _aggregate_rows(dialect, rows):
+    if dialect != 'postgresql':
+        return [tuple(row) for row in rows]
+    # Bit GROUPING() bernilai 1 untuk kolom yang tidak di-group, argumen pertama = bit paling kiri
+    n = len(GROUP_COLUMNS)
+    full = (1 << n) - 1
+    position = {full ^ (1 << (n - 1 - i)): i for i in range(n)}
+    result = []
+    for row in rows:
+        i = position[row[0]]
+        result.append((i, row[1 + i], row[1 + n], row[2 + n]))
+    return result
+
+
+# Fungsi untuk menghitung agregat langsung di database dengan GROUP BY
+# where/params bisa dipakai untuk membatasi baris, misalnya hanya baris baru setelah watermark
+def aggregate_sql(engine, table=TABLE_NAME, where=None, params=None):
+    condition = FILTER_SQL if where is None else f'{FILTER_SQL} AND {where}'
+    dialect = engine.dialect.name
+    with engine.connect() as conn:
+        rows = conn.execute(text(_aggregate_query(dialect, table, condition)), params or {}).fetchall()
+    grouped = {i: [] for i in range(len(GROUP_COLUMNS))}
+    for i, value, heart_disease, count in _aggregate_rows(dialect, rows):
+        grouped[i].append((value, heart_disease, count))
+    aggregates = {}
+    for i, col in enumerate(GROUP_COLUMNS):
+        df = pd.DataFrame(grouped[i], columns=[col, 'HeartDisease', 'count'])
+        aggregates[col] = _finalize(df, col)
+    return aggregates
+
+
+# Fungsi untuk menghitung agregat yang sama dari DataFrame (misalnya dari data.csv)
+def aggregate_frame(df):
+    mask = ((df['Cholesterol'] > 50) & (df['Cholesterol'] < 350)
+            & (df['RestingBP'] > 90) & (df['RestingBP'] < 180)
+            & (df['Oldpeak'] >= 0))
+    df = df.loc[mask]
+    aggregates = {}
+    for col in GROUP_COLUMNS:
+        counts = df.groupby([col, 'HeartDisease'], sort=False).size().reset_index(name='count')
+        aggregates[col] = _finalize(counts, col)
+    return aggregates
+
+
+# Fungsi untuk menghitung agregat dari snapshot kolom (snapshot.py)
+# Hanya kolom yang dibutuhkan yang dibaca, filter dijalankan langsung pada array kode
+def aggregate_snapshot(snapshot):
+    from snapshot import INSIGHTS_FILTERS
+    df = snapshot.to_frame(columns=GROUP_COLUMNS + ['HeartDisease'], filters=INSIGHTS_FILTERS)
+    aggregates = aggregate_frame(df)
+    # GROUP BY dilakukan pada kode integer, label kategori baru dikembalikan pada tabel agregat yang kecil
+    for col, agg in aggregates.items():
+        agg[col] = snapshot.decode(col, agg[col].to_numpy())
+        aggregates[col] = agg.sort_values([col, 'HeartDisease'], ignore_index=True)
+    return aggregates
+
+
+# Fungsi untuk menggabungkan agregat lama dengan agregat dari baris-baris baru
+def merge_aggregates(old, new):
+    merged = {}
+    for col in GROUP_COLUMNS:
+        combined = pd.concat([old[col], new[col]], ignore_index=True)
+        counts = combined.groupby([col, 'HeartDisease'], sort=False)['count'].sum().reset_index()
+        merged[col] = counts.sort_values([col, 'HeartDisease'], ignore_index=True)
+    return merged
+
+
+# Fungsi untuk melakukan binning pada tabel agregat (misalnya umur menjadi kelompok umur)
+# Binning dilakukan pada tabel kecil, bukan pada data mentah
+def bin_counts(agg, col, bins, labels, name):
+    grouped = agg.assign(**{name: pd.cut(agg[col], bins=bins, labels=labels, right=False)})
+    return grouped.groupby([name, 'HeartDisease'], observed=False)['count'].sum().reset_index()
+
+
+# Fungsi untuk mengambil versi data, dipakai sebagai key cache agregat: (jumlah baris, watermark, jumlah perubahan)
+# - watermark = MAX(watermark_column) jika ada kolom watermark (rowid, id, updated_at, ...)
+# - jumlah perubahan = n_tup_upd + n_tup_del dari pg_stat_user_tables (hanya PostgreSQL),
+#   sehingga UPDATE/DELETE yang tidak mengubah jumlah baris tetap terdeteksi
+def data_version(engine, table=TABLE_NAME, watermark_column=None):
+    watermark_sql = f'MAX("{watermark_column}")' if watermark_column else 'NULL'
+    with engine.connect() as conn:
+        count, watermark = conn.execute(text(f'SELECT COUNT(*), {watermark_sql} FROM {table}')).fetchone()
+        modifications = None
+        if engine.dialect.name == 'postgresql':
+            modifications = conn.execute(
+                text('SELECT n_tup_upd + n_tup_del FROM pg_stat_user_tables WHERE relname = :name'),
+                {'name': table.split('.')[-1]}).scalar()
+    return (int(count), watermark, modifications)
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+from encoder import FEATURE_NAMES, encode_frame
+from explain import explain
+from prediction_cache import prediction_cache
+
+# Jumlah baris yang diproses setiap chunk supaya pemakaian memori tetap terbatas
+CHUNK_SIZE = 100_000
+
+# File hasil untuk halaman Batch Prediction disajikan langsung dari disk lewat static serving Streamlit
+# (folder static/ di samping script utama, lihat .streamlit/config.toml), jadi tidak pernah di-load ke memori
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_DIR = os.path.join(BASE_DIR, 'static', 'batch_results')
+RESULT_URL = 'app/static/batch_results'
+RESULT_TTL = float(os.environ.get('HEART_BATCH_RESULT_TTL', 3600))
+
+
+# Fungsi untuk memprediksi satu chunk data
+# Label diturunkan dari probabilitas supaya model cukup dipanggil sekali
+# Chunk kecil memakai prediction_cache, chunk besar langsung ke model (lihat HEART_PREDICTION_CACHE_MAX_BATCH)
+# Jika with_shap=True, probabilitas dan kolom SHAP_<feature> dihitung bersamaan dalam satu panggilan
+def predict_chunk(entry, df, with_shap=False):
+    X = encode_frame(df)
+    result = df.copy()
+    if with_shap:
+        proba, contributions, _ = explain(entry, X)
+        for j, col in enumerate(FEATURE_NAMES):
+            result[f'SHAP_{col}'] = contributions[:, j]
+    else:
+        proba = prediction_cache.predict_proba(entry, X)
+    result['Probability'] = proba
+    result['Prediction'] = (proba > 0.5).astype(int)
+    return result
+
+
+# Fungsi untuk memprediksi file CSV secara bertahap (per chunk) dan menulis hasilnya ke dst
+# entry adalah ModelEntry dari model_registry, satu versi model dipakai untuk seluruh file
+def predict_csv(src, dst, entry, chunksize=CHUNK_SIZE, progress=None, with_shap=False):
+    total = 0
+    for i, chunk in enumerate(pd.read_csv(src, chunksize=chunksize)):
+        result = predict_chunk(entry, chunk, with_shap)
+        result.to_csv(dst, header=(i == 0), index=False)
+        total += len(result)
+        if progress is not None:
+            progress(total)
+    return total
+
+
+# Fungsi untuk menghapus file hasil yang lebih lama dari max_age detik (file berisi data pasien)
+def cleanup_results(max_age=RESULT_TTL):
+    if not os.path.isdir(RESULT_DIR):
+        return
+    now = time.time()
+    for name in os.listdir(RESULT_DIR):
+        path = os.path.join(RESULT_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+_cleaner = None
+_cleaner_lock = threading.Lock()
+
+
+# Membersihkan file hasil secara berkala di background, sehingga TTL tetap berlaku
+# meskipun tidak ada batch baru yang dijalankan
+def start_result_cleaner(max_age=RESULT_TTL):
+    global _cleaner
+    if _cleaner is not None:
+        return _cleaner
+
+    def run():
+        while True:
+            cleanup_results(max_age)
+            time.sleep(min(max_age, 300))
+
+    with _cleaner_lock:
+        if _cleaner is None:
+            _cleaner = threading.Thread(target=run, name='batch-result-cleaner', daemon=True)
+            _cleaner.start()
+    return _cleaner
+
+
+# Fungsi untuk membuat path file hasil baru
+def new_result_path():
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    # Nama random supaya file hasil satu session tidak bisa ditebak oleh session lain
+    return os.path.join(RESULT_DIR, f'{uuid.uuid4().hex}.csv')
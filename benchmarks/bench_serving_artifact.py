@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Membandingkan artifact serving (serving_artifact.py) dengan model CatBoost asli:
+# akurasi pada data test notebook (train_test_split test_size=0.2, random_state=92),
+# serta waktu import, waktu load dan RSS pada proses Python baru (cold start).
+# Contoh: python benchmarks/bench_serving_artifact.py --repeat 5
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from encoder import TARGET, encode_frame  # noqa: E402
+from serving_artifact import LEAF_DTYPES, MODEL_PATH, export, load  # noqa: E402
+
+CSV_PATH = os.path.join(ROOT, 'data.csv')
+RANDOM_STATE = 92
+
+# Kode yang dijalankan di proses baru; hasilnya satu baris JSON
+COLD_START_CODE = '''
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+start = time.perf_counter()
+{import_code}
+imported = time.perf_counter()
+{load_code}
+loaded = time.perf_counter()
+model.predict_proba([[54, 1, 1, 130, 220, 0, 1, 140, 0, 1.0, 2]])
+predicted = time.perf_counter()
+print(json.dumps({{'import_s': imported - start, 'load_s': loaded - imported,
+                  'first_predict_s': predicted - loaded, 'rss_bytes': rss_bytes()}}))
+'''
+
+CATBOOST_CODE = ('from catboost import CatBoostClassifier',
+                 'model = CatBoostClassifier()\nmodel.load_model({path!r})')
+ARTIFACT_CODE = ('from serving_artifact import load',
+                 'model = load({path!r})')
+
+
+def cold_start(import_code, load_code, path, repeat):
+    code = COLD_START_CODE.format(root=ROOT, import_code=import_code, load_code=load_code.format(path=path))
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    # Median setiap metrik dari seluruh run
+    return {key: float(np.median([s[key] for s in samples])) for key in samples[0]}
+
+
+def test_split():
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_csv(CSV_PATH)
+    X, y = encode_frame(df), df[TARGET].to_numpy()
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+    return X, X_test, y_test
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Akurasi, waktu load dan memori artifact serving vs model CatBoost')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--repeat', type=int, default=5, help='Jumlah proses baru per pengukuran cold start')
+    args = parser.parse_args()
+
+    from catboost import CatBoostClassifier
+
+    model = CatBoostClassifier()
+    model.load_model(args.model)
+    X_all, X_test, y_test = test_split()
+    reference_test = model.predict_proba(X_test)[:, 1]
+    reference_all = model.predict_proba(X_all)[:, 1]
+    catboost_accuracy = float(((reference_test > 0.5) == y_test).mean())
+
+    results = [{
+        'variant': 'catboost .cbm',
+        'file_bytes': os.path.getsize(args.model),
+        'test_accuracy': catboost_accuracy,
+        'accuracy_delta': 0.0,
+        'max_abs_proba_diff': 0.0,
+        'changed_predictions': 0,
+        **cold_start(*CATBOOST_CODE, args.model, args.repeat),
+    }]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for leaf_dtype in LEAF_DTYPES:
+            path = export(args.model, os.path.join(tmp, f'model_{leaf_dtype}.qbin'), leaf_dtype)
+            artifact = load(path)
+            proba_test = artifact.predict_proba(X_test)[:, 1]
+            proba_all = artifact.predict_proba(X_all)[:, 1]
+            accuracy = float(((proba_test > 0.5) == y_test).mean())
+            results.append({
+                'variant': f'artifact {leaf_dtype}',
+                'file_bytes': os.path.getsize(path),
+                'test_accuracy': accuracy,
+                'accuracy_delta': accuracy - catboost_accuracy,
+                # Selisih probabilitas dan jumlah prediksi yang berubah dihitung pada seluruh data.csv
+                'max_abs_proba_diff': float(np.max(np.abs(proba_all - reference_all))),
+                'changed_predictions': int(((proba_all > 0.5) != (reference_all > 0.5)).sum()),
+                **cold_start(*ARTIFACT_CODE, path, args.repeat),
+            })
+
+    print(f'Data test: {len(y_test)} baris (test_size=0.2, random_state={RANDOM_STATE})')
+    for r in results:
+        print(f"{r['variant']:<18} {r['file_bytes']:>9,} byte  akurasi {r['test_accuracy']:.4f} ({r['accuracy_delta']:+.4f})"
+              f"  max diff {r['max_abs_proba_diff']:.2e}  berubah {r['changed_predictions']}"
+              f"  import {r['import_s'] * 1000:7.1f} ms  load {r['load_s'] * 1000:6.2f} ms"
+              f"  predict pertama {r['first_predict_s'] * 1000:6.2f} ms  RSS {r['rss_bytes'] / 1024 / 1024:6.1f} MB")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Benchmark suite offline (data.csv + catboost_model_heart_disease.cbm) untuk mendeteksi regresi performa.
+# Contoh:
+#   python benchmarks/bench_suite.py run --out bench_base.json
+#   python benchmarks/bench_suite.py run --out bench_new.json --skip apptest
+#   python benchmarks/bench_suite.py compare bench_base.json bench_new.json
+# Setiap benchmark menyimpan seluruh sampel waktu (detik), sehingga dua run bisa dibandingkan secara statistik.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from encoder import FORM_LABELS, FORM_RANGES, encode_form, encode_frame  # noqa: E402
+from model_registry import MODEL_PATH, get_model_entry  # noqa: E402
+
+CSV_PATH = os.path.join(ROOT, 'data.csv')
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+PAGES = [
+    '💓_Heart_Disease_Prediction.py',
+    os.path.join('pages', '👨‍⚕️_Analysis_Insights.py'),
+    os.path.join('pages', '🖥️_Model_Information.py'),
+    os.path.join('pages', '📂_Batch_Prediction.py'),
+    os.path.join('pages', '📈_Performance.py'),
+]
+
+# Kode yang dijalankan di proses baru untuk mengukur cold load (import catboost + load model)
+COLD_LOAD_CODE = '''
+import time
+start = time.perf_counter()
+from catboost import CatBoostClassifier
+model = CatBoostClassifier()
+model.load_model({path!r})
+print(time.perf_counter() - start)
+'''
+
+
+def measure(fn, repeat, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# Fungsi untuk membuat input form secara random (sama dengan nilai yang dikirim show_predict())
+def random_form_values(rng):
+    values = {col: int(rng.choice(list(values))) for col, values in FORM_RANGES.items()}
+    for col, labels in FORM_LABELS.items():
+        values[col] = str(rng.choice(list(labels)))
+    return values
+
+
+def bench_model_load(results, repeat):
+    def cold():
+        out = subprocess.run([sys.executable, '-c', COLD_LOAD_CODE.format(path=MODEL_PATH)],
+                             check=True, capture_output=True, text=True)
+        return float(out.stdout.strip())
+
+    results['model_load_cold'] = {'samples': [cold() for _ in range(repeat)]}
+
+    from catboost import CatBoostClassifier
+
+    def uncached():
+        CatBoostClassifier().load_model(MODEL_PATH)
+
+    results['model_load_uncached'] = {'samples': measure(uncached, repeat)}
+    results['model_load_warm'] = {'samples': measure(get_model_entry, repeat * 100)}
+
+
+def bench_single_row(results, repeat):
+    from explain import explain, explanation_cache
+    from prediction_cache import prediction_cache
+
+    entry = get_model_entry()
+    rng = np.random.default_rng(92)
+    forms = [random_form_values(rng) for _ in range(repeat * 20)]
+    it = iter(forms * 2)
+
+    # Encoding form + satu panggilan predict_proba (tanpa cache)
+    results['single_row_predict'] = {
+        'samples': measure(lambda: entry.model.predict_proba(encode_form(next(it))), repeat * 20, warmup=0)}
+
+    # Jalur show_predict(): encode_form + explain (probabilitas + SHAP dalam satu panggilan)
+    def explain_uncached():
+        explanation_cache.clear()
+        explain(entry, encode_form(forms[0]))
+
+    results['single_row_explain_uncached'] = {'samples': measure(explain_uncached, repeat * 5)}
+    results['single_row_explain_cached'] = {
+        'samples': measure(lambda: explain(entry, encode_form(forms[0])), repeat * 20)}
+
+    X = encode_form(forms[0])
+    results['single_row_prediction_cache_hit'] = {
+        'samples': measure(lambda: prediction_cache.predict_proba(entry, X), repeat * 20)}
+
+
+def bench_batch(results, repeat, sizes):
+    from batch_predict import predict_chunk
+    from synthetic import SyntheticModel, generate
+
+    entry = get_model_entry()
+    df = pd.read_csv(CSV_PATH)
+    rng = np.random.default_rng(92)
+    synthetic_model = SyntheticModel.fit(df)
+    for size in sizes:
+        batch = df.iloc[rng.integers(0, len(df), size)].reset_index(drop=True)
+        n = repeat if size <= 10_000 else max(3, repeat // 2)
+        results[f'batch_predict_{size}'] = {
+            'samples': measure(lambda: entry.model.predict_proba(encode_frame(batch)), n),
+            'rows': size,
+        }
+        # Jalur Batch Prediction (predict_chunk + prediction_cache) dengan baris yang hampir semuanya unik,
+        # seperti data upload sungguhan (sampel data.csv di atas hanya berisi 918 baris unik)
+        unique_batch = next(generate(synthetic_model, size, chunksize=size, seed=size))
+        results[f'batch_predict_chunk_unique_{size}'] = {
+            'samples': measure(lambda: predict_chunk(entry, unique_batch), n),
+            'rows': size,
+        }
+
+
+def bench_insights(results, repeat):
+    from aggregations import aggregate_frame, aggregate_sql
+    from data_access import load_csv_into
+    from figure_cache import figure_to_bytes
+    from insight_charts import CHARTS
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+
+    df = pd.read_csv(CSV_PATH)
+    results['insights_aggregate_frame'] = {'samples': measure(lambda: aggregate_frame(df), repeat)}
+
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    load_csv_into(engine, CSV_PATH)
+    results['insights_aggregate_sql'] = {'samples': measure(lambda: aggregate_sql(engine), repeat)}
+
+    aggs = aggregate_frame(df)
+    for name, draw in CHARTS.items():
+        results[f'figure_render_{name}'] = {'samples': measure(lambda: figure_to_bytes(draw(aggs)), repeat)}
+
+
+def bench_apptest(results, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    for page in PAGES:
+        path = os.path.join(ROOT, page)
+        name = os.path.splitext(os.path.basename(page))[0].split('_', 1)[1].lower()
+
+        def run_page():
+            at = AppTest.from_file(path, default_timeout=300).run()
+            if at.exception:
+                raise RuntimeError(f'{page}: {at.exception[0].value}')
+            return at
+
+        # Run pertama (warmup) mengisi cache proses, sampel berikutnya adalah run dengan cache hangat
+        results[f'apptest_{name}'] = {'samples': measure(run_page, repeat)}
+
+        if page == PAGES[0]:
+            def submit():
+                at = run_page()
+                at.button[0].click().run()
+            results['apptest_prediction_submit'] = {'samples': measure(submit, repeat)}
+
+
+def run(args):
+    import catboost
+    import streamlit
+
+    results = {}
+    groups = {
+        'model_load': lambda: bench_model_load(results, args.repeat),
+        'single_row': lambda: bench_single_row(results, args.repeat),
+        'batch': lambda: bench_batch(results, args.repeat, args.sizes),
+        'insights': lambda: bench_insights(results, args.repeat),
+        'apptest': lambda: bench_apptest(results, args.repeat),
+    }
+    for group in args.only or list(groups):
+        if group in args.skip:
+            continue
+        start = time.perf_counter()
+        groups[group]()
+        print(f'{group:<12} selesai dalam {time.perf_counter() - start:.1f} s', file=sys.stderr)
+
+    for item in results.values():
+        samples = np.array(item['samples'])
+        item['median_s'] = float(np.median(samples))
+        item['p95_s'] = float(np.percentile(samples, 95))
+        if 'rows' in item:
+            item['rows_per_s'] = item['rows'] / item['median_s']
+
+    commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': commit or None,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'catboost': catboost.__version__,
+            'streamlit': streamlit.__version__,
+            'repeat': args.repeat,
+        },
+        'benchmarks': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    for name, item in results.items():
+        print(f"{name:<36} median {item['median_s'] * 1000:>10.3f} ms   p95 {item['p95_s'] * 1000:>10.3f} ms")
+    print(f'Hasil tersimpan di {args.out}')
+
+
+# Permutation test satu arah pada log waktu: apakah sampel new lebih lambat dari base?
+def slowdown_p_value(base, new, permutations=10_000, seed=92):
+    base = np.log(np.asarray(base))
+    new = np.log(np.asarray(new))
+    observed = new.mean() - base.mean()
+    pooled = np.concatenate([base, new])
+    rng = np.random.default_rng(seed)
+    count = 0
+    for _ in range(permutations):
+        rng.shuffle(pooled)
+        if pooled[len(base):].mean() - pooled[:len(base)].mean() >= observed:
+            count += 1
+    return (count + 1) / (permutations + 1)
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)['benchmarks']
+    with open(args.new) as f:
+        new = json.load(f)['benchmarks']
+
+    slower = []
+    print(f"{'benchmark':<36} {'base ms':>10} {'new ms':>10} {'change':>8} {'p':>8}  status")
+    for name in sorted(set(base) & set(new)):
+        b, n = base[name]['samples'], new[name]['samples']
+        b_med, n_med = np.median(b), np.median(n)
+        change = n_med / b_med - 1
+        p = slowdown_p_value(b, n)
+        # Dianggap regresi jika lebih lambat secara signifikan dan perubahannya melewati threshold
+        if p < args.alpha and change > args.threshold:
+            status = 'SLOWER'
+            slower.append(name)
+        elif change < -args.threshold and slowdown_p_value(n, b) < args.alpha:
+            status = 'faster'
+        else:
+            status = 'ok'
+        print(f'{name:<36} {b_med * 1000:>10.3f} {n_med * 1000:>10.3f} {change * 100:>7.1f}% {p:>8.4f}  {status}')
+
+    for name in sorted(set(base) ^ set(new)):
+        print(f'{name:<36} hanya ada di salah satu hasil')
+
+    if slower:
+        print(f'\n{len(slower)} benchmark lebih lambat secara signifikan: {", ".join(slower)}')
+        sys.exit(1)
+    print('\nTidak ada regresi yang signifikan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite aplikasi Heart Disease Prediction')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='Menjalankan benchmark dan menyimpan hasil dalam JSON')
+    run_parser.add_argument('--out', default='bench_results.json')
+    run_parser.add_argument('--repeat', type=int, default=7, help='Jumlah sampel per benchmark')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=BATCH_SIZES, help='Ukuran batch yang diuji')
+    groups = ['model_load', 'single_row', 'batch', 'insights', 'apptest']
+    run_parser.add_argument('--only', nargs='+', choices=groups, help='Hanya jalankan grup tertentu')
+    run_parser.add_argument('--skip', nargs='+', choices=groups, default=[], help='Lewati grup tertentu')
+
+    compare_parser = sub.add_parser('compare', help='Membandingkan dua hasil benchmark')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--alpha', type=float, default=0.01, help='Batas p-value untuk dianggap signifikan')
+    compare_parser.add_argument('--threshold', type=float, default=0.05, help='Perubahan median minimal (0.05 = 5%%)')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Benchmark tree_engine.py dibandingkan dengan predict_proba bawaan CatBoost
+# Contoh: python benchmarks/bench_tree_engine.py --sizes 1 100 10000 1000000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from encoder import encode_frame  # noqa: E402
+from model_registry import get_model  # noqa: E402
+from tree_engine import compile_model  # noqa: E402
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compiled tree ensemble vs CatBoost')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    model = get_model()
+    engine = compile_model(model)
+    base = encode_frame(pd.read_csv(os.path.join(ROOT, 'data.csv')))
+    rng = np.random.default_rng(92)
+
+    results = []
+    for size in args.sizes:
+        X = base[rng.integers(0, len(base), size)]
+        native = model.predict_proba(X)[:, 1]
+        compiled = engine.predict_proba(X)[:, 1]
+        repeat = args.repeat if size <= 100_000 else max(1, args.repeat // 2)
+        native_s = best_time(lambda: model.predict_proba(X), repeat)
+        compiled_s = best_time(lambda: engine.predict_proba(X), repeat)
+        results.append({
+            'batch_size': size,
+            'catboost_rows_per_s': size / native_s,
+            'compiled_rows_per_s': size / compiled_s,
+            'speedup': native_s / compiled_s,
+            'max_abs_diff': float(np.max(np.abs(native - compiled))),
+        })
+        r = results[-1]
+        print(f"{size:>9,}  catboost {r['catboost_rows_per_s']:>14,.0f} rows/s  compiled {r['compiled_rows_per_s']:>14,.0f} rows/s"
+              f"  speedup {r['speedup']:6.2f}x  max diff {r['max_abs_diff']:.2e}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
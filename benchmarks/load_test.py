@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+# Load test lokal untuk scoring_server.py
+# Contoh: python benchmarks/load_test.py --serve --concurrency 32 --requests 5000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def post(url, payload):
+    body = json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())
+
+
+def wait_until_ready(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + '/health'):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('Scoring server tidak merespons')
+
+
+def run(base_url, records, concurrency, total_requests, batch_size):
+    path = '/predict' if batch_size == 1 else '/predict/batch'
+    latencies = []
+    errors = []
+    counter = iter(range(total_requests))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            if batch_size == 1:
+                payload = records[i % len(records)]
+            else:
+                start = (i * batch_size) % len(records)
+                payload = {'records': records[start:start + batch_size]}
+            t0 = time.perf_counter()
+            try:
+                post(base_url + path, payload)
+            except Exception as e:
+                errors.append(e)
+                continue
+            latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    lat_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rows_per_request': batch_size,
+        'elapsed_s': elapsed,
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(lat_ms, 50)) if len(lat_ms) else None,
+        'p95_ms': float(np.percentile(lat_ms, 95)) if len(lat_ms) else None,
+        'p99_ms': float(np.percentile(lat_ms, 99)) if len(lat_ms) else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test untuk scoring server')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--serve', action='store_true', help='Jalankan scoring_server.py sebagai subprocess')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=1, help='Jumlah record per request (>1 memakai /predict/batch)')
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data.csv'))
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data).drop(columns=['HeartDisease'], errors='ignore')
+    records = json.loads(df.to_json(orient='records'))
+
+    server = None
+    if args.serve:
+        port = args.url.rsplit(':', 1)[-1].strip('/')
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'scoring_server.py'), '--port', port])
+    try:
+        wait_until_ready(args.url)
+        report = run(args.url, records, args.concurrency, args.requests, args.batch_size)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
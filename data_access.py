@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from aggregations import TABLE_NAME, aggregate_snapshot, aggregate_sql, data_version, merge_aggregates
+from metrics import register_gauge, timer
+from snapshot import SNAPSHOT_DIR, open_snapshot
+
+# Akses data spktable untuk seluruh aplikasi.
+# - Satu engine (dengan connection pool) per proses
+# - Jika database tidak dikonfigurasi, data.csv di-load ke SQLite in-memory
+#   sehingga seluruh pipeline (SQL + agregasi) tetap bisa dijalankan secara lokal
+# - Agregat di-refresh secara incremental berdasarkan watermark, perubahan lain (UPDATE/DELETE) memicu rebuild penuh
+# - Agregat dihitung dari snapshot kolom (snapshot.py) hanya jika diminta lewat HEART_DATA_SOURCE=snapshot
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, 'data.csv')
+
+# Konfigurasi pool, bisa diubah lewat environment variable
+POOL_SIZE = int(os.environ.get('HEART_DB_POOL_SIZE', 5))
+MAX_OVERFLOW = int(os.environ.get('HEART_DB_MAX_OVERFLOW', 10))
+POOL_TIMEOUT = float(os.environ.get('HEART_DB_POOL_TIMEOUT', 30))
+POOL_RECYCLE = int(os.environ.get('HEART_DB_POOL_RECYCLE', 1800))
+CONNECT_TIMEOUT = int(os.environ.get('HEART_DB_CONNECT_TIMEOUT', 10))
+
+# Jeda minimal antar pengecekan data baru (detik) dan jeda untuk rebuild penuh agregat
+REFRESH_INTERVAL = float(os.environ.get('HEART_DB_REFRESH_SECONDS', 60))
+FULL_REFRESH_INTERVAL = float(os.environ.get('HEART_DB_FULL_REFRESH_SECONDS', 3600))
+
+_lock = threading.RLock()
+_engine = None
+_store = None
+
+
+# Fungsi untuk mengambil URL database dari environment atau Streamlit secrets
+def database_url():
+    url = os.environ.get('POSTGRES_CREDENTIAL')
+    if url:
+        return url
+    try:
+        import streamlit as st
+        return st.secrets['postgres_credential']
+    except Exception:
+        return None
+
+
+# Fungsi untuk membuat tabel dengan kolom dan tipe yang sama dengan DataFrame df
+def create_table(conn, df, table=TABLE_NAME, replace=True):
+    types = {col: 'INTEGER' if pd.api.types.is_integer_dtype(dtype)
+             else 'REAL' if pd.api.types.is_float_dtype(dtype) else 'TEXT'
+             for col, dtype in df.dtypes.items()}
+    columns = ', '.join(f'"{col}" {sql_type}' for col, sql_type in types.items())
+    if replace:
+        conn.execute(text(f'DROP TABLE IF EXISTS {table}'))
+    conn.execute(text(f'CREATE TABLE IF NOT EXISTS {table} ({columns})'))
+
+
+# Fungsi untuk memindahkan data.csv ke database SQLite (fallback lokal)
+def load_csv_into(engine, path=CSV_PATH, table=TABLE_NAME):
+    df = pd.read_csv(path)
+    placeholders = ', '.join(f':p{i}' for i in range(len(df.columns)))
+    rows = [{f'p{i}': value for i, value in enumerate(row)}
+            for row in df.astype(object).itertuples(index=False, name=None)]
+    with engine.begin() as conn:
+        create_table(conn, df, table)
+        conn.execute(text(f'INSERT INTO {table} VALUES ({placeholders})'), rows)
+    return len(df)
+
+
+def _create_engine(url):
+    if url is None:
+        engine = create_engine('sqlite://', poolclass=StaticPool,
+                               connect_args={'check_same_thread': False})
+        load_csv_into(engine)
+        return engine
+    if url.startswith('sqlite'):
+        return create_engine(url, connect_args={'check_same_thread': False}, pool_pre_ping=True)
+
+    connect_args = {'connect_timeout': CONNECT_TIMEOUT} if url.startswith('postgres') else {}
+    return create_engine(url, pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW,
+                         pool_timeout=POOL_TIMEOUT, pool_recycle=POOL_RECYCLE,
+                         pool_pre_ping=True, connect_args=connect_args)
+
+
+# Fungsi untuk mengambil engine yang di-share oleh seluruh session dalam satu proses
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = _create_engine(database_url())
+    return _engine
+
+
+# Menyimpan agregat Insights dan memperbaruinya secara incremental:
+# hanya baris dengan watermark lebih besar dari watermark terakhir yang diambil dari database
+class AggregateStore:
+    def __init__(self, engine, table=TABLE_NAME, watermark_column=None,
+                 refresh_interval=REFRESH_INTERVAL, full_refresh_interval=FULL_REFRESH_INTERVAL):
+        self.engine = engine
+        self.table = table
+        self.watermark_column = watermark_column
+        self.refresh_interval = refresh_interval
+        self.full_refresh_interval = full_refresh_interval
+        self.aggregates = None
+        self.watermark = None
+        self.data_version = None
+        self.version = None
+        self.full_refreshes = 0
+        self.incremental_refreshes = 0
+        self._checked_at = 0
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def _count_between(self, lo, hi):
+        with self.engine.connect() as conn:
+            query = (f'SELECT COUNT(*) FROM {self.table} '
+                     f'WHERE "{self.watermark_column}" > :lo AND "{self.watermark_column}" <= :hi')
+            return int(conn.execute(text(query), {'lo': lo, 'hi': hi}).scalar())
+
+    @timer('aggregate_refresh', kind='full')
+    def _full_refresh(self):
+        self.data_version = data_version(self.engine, self.table, self.watermark_column)
+        self.watermark = self.data_version[1]
+        if self.watermark_column is None or self.watermark is None:
+            self.aggregates = aggregate_sql(self.engine, self.table)
+        else:
+            self.aggregates = aggregate_sql(self.engine, self.table,
+                                            where=f'"{self.watermark_column}" <= :hi',
+                                            params={'hi': self.watermark})
+        self.full_refreshes += 1
+        self._built_at = time.time()
+
+    @timer('aggregate_refresh', kind='incremental')
+    def _incremental_refresh(self):
+        current = data_version(self.engine, self.table, self.watermark_column)
+        if current == self.data_version:
+            return False
+        count, latest, modifications = current
+        old_count, _, old_modifications = self.data_version
+        # Tanpa kolom watermark, ada UPDATE/DELETE (PostgreSQL), atau watermark tidak bertambah:
+        # agregat tidak bisa digabung dengan delta, jadi dihitung ulang penuh
+        if (self.watermark_column is None or modifications != old_modifications
+                or latest is None or self.watermark is None or latest <= self.watermark):
+            self._full_refresh()
+            return True
+
+        # Jumlah baris harus sama dengan jumlah lama + baris baru, jika tidak berarti ada baris yang dihapus
+        if old_count + self._count_between(self.watermark, latest) != count:
+            self._full_refresh()
+            return True
+        delta = aggregate_sql(self.engine, self.table,
+                              where=f'"{self.watermark_column}" > :lo AND "{self.watermark_column}" <= :hi',
+                              params={'lo': self.watermark, 'hi': latest})
+        self.aggregates = merge_aggregates(self.aggregates, delta)
+        self.watermark = latest
+        self.data_version = current
+        self.incremental_refreshes += 1
+        return True
+
+    # Fungsi untuk memperbarui agregat, paling sering sekali setiap refresh_interval detik
+    def refresh(self, force=False):
+        now = time.time()
+        if not force and self.aggregates is not None and now - self._checked_at < self.refresh_interval:
+            return False
+        with self._lock:
+            if not force and self.aggregates is not None and now - self._checked_at < self.refresh_interval:
+                return False
+            if self.aggregates is None or force or now - self._built_at >= self.full_refresh_interval:
+                self._full_refresh()
+                changed = True
+            else:
+                changed = self._incremental_refresh()
+            self._checked_at = now
+            self.version = (self.table, self.watermark, self.full_refreshes)
+            return changed
+
+    def get(self):
+        self.refresh()
+        return self.aggregates, self.version
+
+    def stats(self):
+        return {
+            'watermark': self.watermark,
+            'full_refreshes': self.full_refreshes,
+            'incremental_refreshes': self.incremental_refreshes,
+            'checked_at': self._checked_at,
+        }
+
+
+# Menyimpan agregat Insights yang dihitung dari snapshot kolom terbaru
+# Versi agregat sama dengan versi snapshot, sehingga agregat hanya dihitung ulang jika ada snapshot baru
+class SnapshotAggregateStore:
+    def __init__(self, root=SNAPSHOT_DIR, refresh_interval=REFRESH_INTERVAL):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self.aggregates = None
+        self.version = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        now = time.time()
+        if not force and self.aggregates is not None and now - self._checked_at < self.refresh_interval:
+            return False
+        with self._lock:
+            snapshot = open_snapshot(self.root)
+            self._checked_at = now
+            if snapshot is None or snapshot.version == self.version and not force:
+                return False
+            with timer('aggregate_refresh', kind='snapshot'):
+                self.aggregates = aggregate_snapshot(snapshot)
+            self.version = ('snapshot', snapshot.version)
+            return True
+
+    def get(self):
+        self.refresh()
+        if self.aggregates is None:
+            raise FileNotFoundError(f'Snapshot belum dibuat di {self.root}, jalankan python snapshot.py terlebih dahulu '
+                                    'atau hapus HEART_DATA_SOURCE=snapshot')
+        return self.aggregates, self.version
+
+    def stats(self):
+        return {'version': self.version, 'checked_at': self._checked_at}
+
+
+# Kolom watermark default: rowid untuk SQLite, untuk database lain harus diatur lewat HEART_DB_WATERMARK_COLUMN
+def default_watermark_column(engine):
+    column = os.environ.get('HEART_DB_WATERMARK_COLUMN')
+    if column:
+        return column
+    return 'rowid' if engine.dialect.name == 'sqlite' else None
+
+
+# Fungsi untuk memilih sumber agregat: database jika dikonfigurasi, jika tidak data.csv (SQLite)
+# Snapshot hanya dipakai dengan HEART_DATA_SOURCE=snapshot, supaya halaman tidak diam-diam memakai
+# snapshot yang sudah lama atau berisi data sintetis
+def _create_store():
+    if os.environ.get('HEART_DATA_SOURCE') == 'snapshot':
+        return SnapshotAggregateStore()
+    engine = get_engine()
+    return AggregateStore(engine, watermark_column=default_watermark_column(engine))
+
+
+# Statistik connection pool (hanya untuk engine dengan QueuePool)
+def pool_stats():
+    pool = _engine.pool if _engine is not None else None
+    if pool is None or not hasattr(pool, 'checkedout'):
+        return None
+    return {'size': pool.size(), 'checked_out': pool.checkedout(), 'overflow': pool.overflow()}
+
+
+register_gauge('db_pool', pool_stats)
+
+
+# Fungsi untuk mengambil store agregat yang di-share oleh seluruh session dalam satu proses
+def get_aggregate_store():
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = _create_store()
+    return _store
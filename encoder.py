@@ -0,0 +1,153 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# Satu-satunya sumber mapping encoding feature.
+# Dipakai oleh form prediksi, batch prediction, scoring server dan proses training,
+# supaya encoding saat training dan saat serving selalu sama.
+
+# Urutan feature sesuai dengan urutan saat model di-train
+FEATURE_NAMES = ['Age', 'Sex', 'ChestPainType', 'RestingBP', 'Cholesterol', 'FastingBS',
+                 'RestingECG', 'MaxHR', 'ExerciseAngina', 'Oldpeak', 'ST_Slope']
+TARGET = 'HeartDisease'
+
+# Mapping kategori sesuai encoding pada Notebook_Prediction.ipynb
+CATEGORY_MAPS = {
+    'Sex': {'M': 1, 'F': 2},
+    'ChestPainType': {'ASY': 1, 'NAP': 2, 'ATA': 3, 'TA': 4},
+    'RestingECG': {'Normal': 1, 'LVH': 2, 'ST': 3},
+    'ExerciseAngina': {'N': 0, 'Y': 1},
+    'ST_Slope': {'Up': 1, 'Flat': 2, 'Down': 3},
+}
+
+# Label pilihan pada form Streamlit dan nilai data.csv yang diwakilinya (urutan = urutan pilihan di form)
+FORM_LABELS = {
+    'Sex': {'Laki-laki': 'M', 'Perempuan': 'F'},
+    'ChestPainType': {'Asymptomatic': 'ASY', 'Non-anginal Pain': 'NAP', 'Atypical Angina': 'ATA', 'Typical Angina': 'TA'},
+    'FastingBS': {'Di bawah 120mg/dL': 0, 'Di atas 120mg/dL': 1},
+    'RestingECG': {'Normal': 'Normal', 'Penebalan Dinding Ventrikel Kiri': 'LVH', 'Segmen ST Abnormal': 'ST'},
+    'ExerciseAngina': {'Iya': 'Y', 'Tidak': 'N'},
+    'ST_Slope': {'Upsloping': 'Up', 'Flat': 'Flat', 'Downsloping': 'Down'},
+}
+
+# Rentang nilai slider numerik pada form Streamlit (dipakai juga oleh mode what-if)
+FORM_RANGES = {
+    'Age': range(1, 126),
+    'RestingBP': range(90, 181),
+    'Cholesterol': range(145, 361),
+    'MaxHR': range(60, 201),
+    'Oldpeak': range(0, 7),
+}
+
+# Key metadata pada file .cbm untuk menyimpan skema encoding yang dipakai saat training
+SCHEMA_METADATA_KEY = 'encoder_schema'
+
+
+# Fungsi untuk membuat representasi skema yang disimpan di metadata model
+def schema_json():
+    return json.dumps({'features': FEATURE_NAMES, 'categories': CATEGORY_MAPS}, sort_keys=True)
+
+
+# Mapping kategori di-compile menjadi lookup array NumPy:
+# nilai string dicari posisinya lewat hash index (vectorized), lalu kodenya diambil dengan np.take
+class _LookupTable:
+    def __init__(self, mapping):
+        self.index = pd.Index(list(mapping.keys()))
+        self.codes = np.array(list(mapping.values()), dtype=np.float64)
+        self.mapping = mapping
+
+    def encode(self, col, values):
+        positions = self.index.get_indexer(values)
+        unknown = positions < 0
+        if unknown.any():
+            # Coba sekali lagi untuk nilai yang mengandung spasi, hanya pada baris yang gagal
+            stripped = pd.Series(values[unknown]).astype(str).str.strip().to_numpy()
+            positions[unknown] = self.index.get_indexer(stripped)
+            unknown = positions < 0
+            if unknown.any():
+                bad = sorted({str(v) for v in values[unknown]})[:5]
+                raise ValueError(f"Nilai tidak dikenal pada kolom {col}: {', '.join(bad)}")
+        return np.take(self.codes, positions)
+
+
+LOOKUP_TABLES = {col: _LookupTable(mapping) for col, mapping in CATEGORY_MAPS.items()}
+
+
+# Fungsi untuk mengecek kolom yang wajib ada pada data input
+def check_columns(df):
+    missing = [col for col in FEATURE_NAMES if col not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom berikut tidak ditemukan: {', '.join(missing)}")
+
+
+# Fungsi untuk mengubah DataFrame dengan skema data.csv menjadi matrix numerik untuk model
+def encode_frame(df):
+    check_columns(df)
+    X = np.empty((len(df), len(FEATURE_NAMES)), dtype=np.float64)
+    for i, col in enumerate(FEATURE_NAMES):
+        if col in LOOKUP_TABLES:
+            X[:, i] = LOOKUP_TABLES[col].encode(col, df[col].to_numpy())
+        else:
+            values = pd.to_numeric(df[col], errors='coerce')
+            if values.isna().any():
+                raise ValueError(f"Kolom {col} harus berisi angka")
+            X[:, i] = values.to_numpy(dtype=np.float64)
+    return X
+
+
+# Fungsi untuk meng-encode list record (dict) dari request API tanpa membuat DataFrame
+# Setiap kolom dikumpulkan menjadi satu array, lalu di-encode sekaligus seperti encode_frame
+def encode_records(records):
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError('Setiap record harus berupa object JSON')
+    X = np.empty((len(records), len(FEATURE_NAMES)), dtype=np.float64)
+    for i, col in enumerate(FEATURE_NAMES):
+        try:
+            values = [record[col] for record in records]
+        except KeyError:
+            r = next(r for r, record in enumerate(records) if col not in record)
+            raise ValueError(f'Kolom {col} tidak ditemukan pada record ke-{r}')
+        if col in LOOKUP_TABLES:
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            try:
+                X[:, i] = LOOKUP_TABLES[col].encode(col, column)
+            except TypeError:
+                raise ValueError(f'Nilai tidak dikenal pada kolom {col}')
+        else:
+            try:
+                X[:, i] = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ValueError(f'Kolom {col} harus berisi angka')
+            if np.isnan(X[:, i]).any():
+                raise ValueError(f'Kolom {col} harus berisi angka')
+    return X
+
+
+# Fungsi untuk meng-encode input dari form Streamlit (label pilihan -> nilai data.csv -> kode model)
+def encode_form(values):
+    record = {}
+    for col in FEATURE_NAMES:
+        value = values[col]
+        record[col] = FORM_LABELS[col][value] if col in FORM_LABELS else value
+    return encode_records([record])
+
+
+# Fungsi untuk memastikan model .cbm di-train dengan skema encoding yang sama
+# Model lama yang belum menyimpan skema hanya dicek urutan feature-nya
+def check_model_schema(model):
+    if list(model.feature_names_) != FEATURE_NAMES:
+        raise ValueError(f'Urutan feature model ({model.feature_names_}) tidak sesuai dengan encoder ({FEATURE_NAMES})')
+    saved = dict(model.get_metadata()).get(SCHEMA_METADATA_KEY)
+    if saved is None:
+        return False
+    if json.loads(saved) != json.loads(schema_json()):
+        raise ValueError('Skema encoding pada model berbeda dengan skema pada encoder.py')
+    return True
+
+
+# Fungsi untuk menyimpan skema encoding ke metadata model sebelum model disimpan
+def attach_schema(model):
+    model.get_metadata()[SCHEMA_METADATA_KEY] = schema_json()
+    return model
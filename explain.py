@@ -0,0 +1,97 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from catboost import Pool
+
+from encoder import FEATURE_NAMES, encode_frame
+from metrics import register_gauge, timer
+from model_registry import BASE_DIR, get_model_entry
+from prediction_cache import PredictionCache, prediction_cache
+
+# Penjelasan prediksi per input dengan SHAP values dari CatBoost (tree SHAP).
+# Output ShapValues berisi kontribusi setiap feature + expected value (dalam log-odds),
+# sehingga probabilitas = sigmoid(jumlah seluruh kolom). Prediksi dan penjelasan didapat dari satu panggilan.
+
+CSV_PATH = os.path.join(BASE_DIR, 'data.csv')
+DEFAULT_MAX_ENTRIES = int(os.environ.get('HEART_EXPLANATION_CACHE_SIZE', 20_000))
+
+# Batch kecil lebih cepat tanpa precalc, batch besar lebih cepat dengan precalc
+# (precalc butuh waktu tetap ~2 detik per panggilan untuk model 100 pohon depth 8)
+PRECALC_MIN_ROWS = 200
+
+# Cache SHAP values per vektor input + versi model, di-share oleh form dan batch prediction
+explanation_cache = PredictionCache('explanation', max_entries=DEFAULT_MAX_ENTRIES)
+register_gauge('explanation_cache', explanation_cache.stats)
+
+_lock = threading.Lock()
+_global_importance = {}
+
+
+def _sigmoid(raw):
+    return 1.0 / (1.0 + np.exp(-raw))
+
+
+# Fungsi untuk menghitung SHAP values mentah, hasil (n, jumlah feature + 1)
+def shap_values(model, X):
+    mode = 'UsePreCalc' if len(X) >= PRECALC_MIN_ROWS else 'NoPreCalc'
+    return model.get_feature_importance(Pool(X, feature_names=FEATURE_NAMES), type='ShapValues', shap_mode=mode)
+
+
+# Fungsi utama: (probabilitas, kontribusi per feature (n, 11), expected value (n,)) untuk setiap baris X
+# Batch yang lebih besar dari kapasitas cache (misalnya Batch Prediction dengan SHAP) dihitung langsung,
+# tanpa disimpan di explanation_cache maupun prediction_cache supaya entry milik form tidak terusir
+def explain(entry, X):
+    values = explanation_cache.get_or_compute(entry, X, shap_values)
+    values = np.asarray(values, dtype=np.float64).reshape(-1, len(FEATURE_NAMES) + 1)
+    proba = _sigmoid(values.sum(axis=1))
+    # Probabilitas juga disimpan di prediction_cache, sehingga form, batch prediction dan scoring server
+    # memakai cache prediksi yang sama meskipun jalur ini menghitungnya dari SHAP values
+    prediction_cache.put(entry, X, proba)
+    return proba, values[:, :-1], values[:, -1]
+
+
+# Fungsi untuk menyusun tabel kontribusi satu prediksi, diurutkan dari pengaruh terbesar
+# values adalah nilai input (sebelum di-encode) dengan urutan FEATURE_NAMES
+def contribution_table(values, contributions):
+    table = pd.DataFrame({
+        'Feature': FEATURE_NAMES,
+        'Nilai': [str(v) for v in values],
+        'Kontribusi (log-odds)': contributions,
+    })
+    table['Pengaruh'] = np.where(contributions > 0, 'Menaikkan risiko', 'Menurunkan risiko')
+    return table.reindex(table['Kontribusi (log-odds)'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+
+# Ringkasan global: rata-rata |SHAP| setiap feature pada data.csv
+# Dihitung sekali per versi model lalu dipakai ulang oleh seluruh session
+def global_importance(entry=None, path=CSV_PATH):
+    entry = entry or get_model_entry()
+    key = (entry.version, path)
+    importance = _global_importance.get(key)
+    if importance is not None:
+        return importance
+
+    with _lock:
+        importance = _global_importance.get(key)
+        if importance is None:
+            with timer('global_importance'):
+                X = encode_frame(pd.read_csv(path))
+                values = shap_values(entry.model, X)
+            importance = pd.Series(np.abs(values[:, :-1]).mean(axis=0), index=FEATURE_NAMES).sort_values(ascending=False)
+            _global_importance[key] = importance
+    return importance
+
+
+# Fungsi untuk menggambar ringkasan global importance sebagai bar horizontal
+def draw_global_importance(importance):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(9, 5))
+    ax = fig.subplots()
+    ordered = importance.sort_values()
+    ax.barh(ordered.index, ordered.values, color='#f22c2c')
+    ax.set_xlabel('Rata-rata |SHAP value| (log-odds)')
+    ax.set_title('Pengaruh Setiap Feature terhadap Prediksi')
+    return fig
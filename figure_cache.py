@@ -0,0 +1,194 @@
+import hashlib
+import io
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from metrics import register_gauge, timer
+
+# Cache untuk grafik yang sudah di-render (dalam bentuk bytes PNG/SVG).
+# Setiap grafik cukup di-render sekali per versi data/model, lalu dipakai ulang oleh semua session.
+# Tier pertama adalah LRU di memori dengan batas ukuran, tier kedua (opsional) adalah folder di disk.
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get('HEART_FIGURE_CACHE_MB', 64)) * 1024 * 1024)
+DEFAULT_DISK_DIR = os.environ.get('HEART_FIGURE_CACHE_DIR')
+
+
+# Fungsi untuk mengubah figure matplotlib menjadi bytes, lalu membebaskan figure tersebut
+def figure_to_bytes(fig, fmt='png', dpi=200):
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+    finally:
+        fig.clear()
+        # Figure yang dibuat lewat pyplot juga harus dilepas dari state global pyplot
+        plt = sys.modules.get('matplotlib.pyplot')
+        if plt is not None:
+            plt.close(fig)
+    return buffer.getvalue()
+
+
+# Label metric untuk nama grafik; hanya dua bagian pertama supaya jumlah label tetap terbatas
+# (contoh: ('insight', 'age') -> 'insight/age', ('what_if', 'MaxHR', profil) -> 'what_if/MaxHR')
+def _metric_label(name):
+    if isinstance(name, tuple):
+        return '/'.join(str(part) for part in name[:2])
+    return str(name)
+
+
+class FigureCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_dir=DEFAULT_DISK_DIR):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_errors = 0
+        self._items = OrderedDict()
+        self._prefetching = set()
+        # Satu lock per grafik yang sedang di-render, supaya grafik yang sama tidak di-render dua kali
+        # oleh beberapa session (atau prefetch) secara bersamaan
+        self._render_locks = {}
+        self._lock = threading.Lock()
+        if disk_dir:
+            try:
+                os.makedirs(disk_dir, exist_ok=True)
+            except OSError:
+                self._disable_disk()
+
+    def _disk_path(self, key, fmt):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, f'{digest}.{fmt}')
+
+    # Jika folder disk tidak bisa dipakai (penuh, read-only, ...), cache tetap berjalan di memori saja
+    def _disable_disk(self):
+        self.disk_dir = None
+        self.disk_errors += 1
+
+    def _read_disk(self, key, fmt):
+        path = self._disk_path(key, fmt)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            self._disable_disk()
+            return None
+
+    def _write_disk(self, key, fmt, data):
+        path = self._disk_path(key, fmt)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._disable_disk()
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _put(self, key, data):
+        with self._lock:
+            if key in self._items:
+                return
+            if len(data) > self.max_bytes:
+                return
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            return data
+
+    # Fungsi utama: ambil grafik dari cache, atau render dengan draw() jika belum ada
+    # draw() harus mengembalikan figure matplotlib
+    def get_or_render(self, name, version, draw, fmt='png'):
+        key = (name, version, fmt)
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            render_lock = self._render_locks.setdefault(key, threading.Lock())
+        try:
+            with render_lock:
+                # Session lain mungkin sudah selesai me-render grafik ini selama menunggu lock
+                data = self.get(key)
+                if data is not None:
+                    return data
+
+                if self.disk_dir:
+                    data = self._read_disk(key, fmt)
+                    if data is not None:
+                        self.disk_hits += 1
+                        self._put(key, data)
+                        return data
+
+                self.misses += 1
+                with timer('figure_render', figure=_metric_label(name)):
+                    data = figure_to_bytes(draw(), fmt=fmt)
+                self._put(key, data)
+                if self.disk_dir:
+                    self._write_disk(key, fmt, data)
+                return data
+        finally:
+            with self._lock:
+                if self._render_locks.get(key) is render_lock:
+                    del self._render_locks[key]
+
+    # Fungsi untuk me-render beberapa grafik di background thread (misalnya section yang belum dibuka)
+    # items berisi (name, version, draw); grafik yang sudah ada di cache atau sedang di-render dilewati
+    def prefetch(self, items, fmt='png'):
+        with self._lock:
+            pending = [(name, version, draw) for name, version, draw in items
+                       if (name, version, fmt) not in self._items and (name, version, fmt) not in self._prefetching]
+            self._prefetching.update((name, version, fmt) for name, version, _ in pending)
+        if not pending:
+            return None
+
+        def run():
+            for name, version, draw in pending:
+                try:
+                    self.get_or_render(name, version, draw, fmt)
+                except Exception:
+                    pass
+                finally:
+                    with self._lock:
+                        self._prefetching.discard((name, version, fmt))
+
+        thread = threading.Thread(target=run, name='figure-prefetch', daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def stats(self):
+        return {
+            'items': len(self._items),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'disk_errors': self.disk_errors,
+        }
+
+
+# Cache yang di-share oleh seluruh halaman dalam satu proses
+figure_cache = FigureCache()
+register_gauge('figure_cache', figure_cache.stats)
@@ -0,0 +1,147 @@
+from aggregations import bin_counts
+
+# Fungsi-fungsi untuk menggambar grafik pada halaman Analysis Insights.
+# Setiap fungsi menerima tabel agregat dari aggregations.py dan mengembalikan Figure baru
+# (tidak memakai state global pyplot), sehingga hasilnya bisa di-cache oleh figure_cache.
+# matplotlib dan seaborn baru di-import saat grafik pertama di-render, bukan saat modul ini di-import.
+
+yes_color = '#f22c2c'
+no_color = '#027302'
+palette = {'Yes': yes_color, 'No': no_color}
+hue_order = ['No', 'Yes']
+
+
+# Memberi anotasi jumlah di atas setiap bar
+def _annotate(ax):
+    for p in ax.patches:
+        if p.get_height() > 0:
+            ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
+                        ha='center', va='center', xytext=(0, 5), textcoords='offset points')
+
+
+def _new_axes(figsize):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots()
+
+
+def _bar(aggs_table, x, figsize, order=None):
+    import seaborn as sns
+
+    fig, ax = _new_axes(figsize)
+    sns.barplot(data=aggs_table, x=x, y='count', order=order, hue='HeartDisease', hue_order=hue_order, palette=palette, ax=ax)
+    _annotate(ax)
+    return fig, ax
+
+
+def _hist(aggs_table, x, binwidth, figsize, colors=palette):
+    import seaborn as sns
+
+    fig, ax = _new_axes(figsize)
+    sns.histplot(data=aggs_table, x=x, weights='count', binwidth=binwidth, hue='HeartDisease', hue_order=hue_order, palette=colors, ax=ax)
+    return fig, ax
+
+
+def draw_age(aggs):
+    # Lakukan binning untuk age
+    bins = [20, 30, 40, 50, 60, 70]
+    labels = ['21-30', '31-40', '41-50', '51-60', '61-70']
+    age_group = bin_counts(aggs['Age'], 'Age', bins, labels, 'Age Group')
+
+    fig, ax = _bar(age_group, 'Age Group', (9, 5))
+    ax.set_title('Heart Disease Berdasarkan Umur')
+    return fig
+
+
+def draw_max_hr(aggs):
+    fig, ax = _hist(aggs['MaxHR'], 'MaxHR', 5, (10, 5), colors={'Yes': 'red', 'No': no_color})
+    ax.set_title('Heart Disease Berdasarkan Maximum Heart Rate')
+    return fig
+
+
+def draw_sex(aggs):
+    fig, ax = _bar(aggs['Sex'], 'Sex', (8, 5), order=['M', 'F'])
+    ax.set_xticks([0, 1])
+    ax.set_xticklabels(['Male', 'Female'])
+    ax.set_title('Heart Disease Berdasarkan Jenis Kelamin')
+    return fig
+
+
+def draw_chest_pain(aggs):
+    fig, ax = _bar(aggs['ChestPainType'], 'ChestPainType', (8, 5), order=['ATA', 'NAP', 'ASY', 'TA'])
+    ax.set_title('Heart Disease Berdasarkan Tipe Chest Pain')
+    return fig
+
+
+def draw_resting_bp(aggs):
+    fig, ax = _hist(aggs['RestingBP'], 'RestingBP', 5, (10, 5))
+    ax.set_title('Heart Disease Berdasarkan Tekanan Darah')
+    ax.set_xlabel('Tekanan Darah (mmHg)')
+    return fig
+
+
+def draw_cholesterol(aggs):
+    # Lakukan binning untuk kolesterol
+    bins = [100, 150, 200, 250, 300, 350]
+    labels = ['101-150', '151-200', '201-250', '251-300', '301-350']
+    cholesterol_group = bin_counts(aggs['Cholesterol'], 'Cholesterol', bins, labels, 'Cholesterol Group')
+
+    fig, ax = _bar(cholesterol_group, 'Cholesterol Group', (10, 5))
+    ax.set_xlabel('Retang Total Kolesterol (mg/dL)')
+    ax.set_title('Heart Disease Berdasarkan Tingkat Kolesterol')
+    return fig
+
+
+def draw_fasting_bs(aggs):
+    fig, ax = _bar(aggs['FastingBS'], 'FastingBS', (8, 5), order=[0, 1])
+    ax.set_xticks([0, 1])
+    ax.set_xticklabels(['Kurang dari 120 mg/dL', 'Lebih dari 120 mg/dL'])
+    ax.set_xlabel('Kadar Gula Darah')
+    ax.set_title('Heart Disease Berdasarkan Kadar Gula Darah')
+    return fig
+
+
+def draw_resting_ecg(aggs):
+    fig, ax = _bar(aggs['RestingECG'], 'RestingECG', (8, 5), order=['Normal', 'ST', 'LVH'])
+    ax.set_title('Heart Disease Berdasarkan Hasil Resting Electrocardiogram ')
+    return fig
+
+
+def draw_oldpeak(aggs):
+    fig, ax = _hist(aggs['Oldpeak'], 'Oldpeak', 0.25, (10, 5))
+    ax.set_title('Heart Disease Berdasarkan Tingkat Depresi Segmen ST')
+    ax.set_xlabel('Tingkat Depresi Segmen ST')
+    return fig
+
+
+def draw_exercise_angina(aggs):
+    fig, ax = _bar(aggs['ExerciseAngina'], 'ExerciseAngina', (8, 5), order=['N', 'Y'])
+    ax.set_title('Heart Disease Berdasarkan Angina Akibat Olahraga')
+    ax.set_xticks([0, 1])
+    ax.set_xticklabels(['Tidak', 'Iya'])
+    ax.set_xlabel('Angina')
+    return fig
+
+
+def draw_st_slope(aggs):
+    fig, ax = _bar(aggs['ST_Slope'], 'ST_Slope', (8, 5), order=['Up', 'Flat', 'Down'])
+    ax.set_title('Heart Disease Berdasarkan Kemiringan Segmen ST')
+    ax.set_xlabel('Kemiringan Segmen ST')
+    return fig
+
+
+# Urutan grafik sesuai urutan section pada halaman
+CHARTS = {
+    'age': draw_age,
+    'max_hr': draw_max_hr,
+    'sex': draw_sex,
+    'chest_pain': draw_chest_pain,
+    'resting_bp': draw_resting_bp,
+    'cholesterol': draw_cholesterol,
+    'fasting_bs': draw_fasting_bs,
+    'resting_ecg': draw_resting_ecg,
+    'oldpeak': draw_oldpeak,
+    'exercise_angina': draw_exercise_angina,
+    'st_slope': draw_st_slope,
+}
@@ -0,0 +1,236 @@
+import bisect
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+# Instrumentasi ringan untuk seluruh aplikasi (Streamlit, batch prediction, scoring server).
+# - timer(): context manager / decorator untuk mengukur durasi, hasilnya masuk ke histogram
+# - count(): counter biasa
+# - register_gauge(): nilai yang dibaca saat export (misalnya statistik cache)
+# Export dalam format teks Prometheus lewat prometheus_text(), GET /metrics di scoring server,
+# atau file yang ditulis berkala jika HEART_METRICS_FILE diisi.
+
+# Batas bucket histogram dalam detik (sama dengan default client Prometheus + beberapa bucket tambahan)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Jumlah sampel terakhir yang disimpan untuk menghitung p50/p95
+RECENT_SAMPLES = 2048
+
+METRICS_FILE = os.environ.get('HEART_METRICS_FILE')
+METRICS_FILE_INTERVAL = float(os.environ.get('HEART_METRICS_FILE_SECONDS', 15))
+# Session dianggap aktif jika membuka halaman dalam rentang waktu ini (detik)
+SESSION_WINDOW = float(os.environ.get('HEART_SESSION_WINDOW_SECONDS', 1800))
+
+
+class Histogram:
+    def __init__(self):
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q):
+        samples = sorted(self.recent)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    # Gauge dibaca saat export; fn mengembalikan satu angka atau dict {nama: angka}
+    def register_gauge(self, name, fn):
+        self.gauges[name] = fn
+
+    # Bisa dipakai sebagai context manager (with timer('x'):) atau decorator (@timer('x'))
+    def timer(self, name, **labels):
+        return _Timer(self, name, labels)
+
+    def gauge_values(self):
+        values = {}
+        for name, fn in list(self.gauges.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            if isinstance(value, dict):
+                # Dict di-export sebagai beberapa gauge: <name>_<key>, hanya nilai numerik
+                for key, v in value.items():
+                    if isinstance(v, (int, float)) and not isinstance(v, bool):
+                        values[(f'{name}_{key}', ())] = v
+            elif value is not None:
+                values[(name, ())] = value
+        return values
+
+    # Ringkasan untuk halaman Performance
+    def summary(self):
+        with self._lock:
+            items = [(key, h.count, h.sum, h.quantile(0.5), h.quantile(0.95)) for key, h in self.histograms.items()]
+        return [{
+            'name': name,
+            'labels': dict(labels),
+            'count': count,
+            'mean_ms': total / count * 1000 if count else None,
+            'p50_ms': p50 * 1000 if p50 is not None else None,
+            'p95_ms': p95 * 1000 if p95 is not None else None,
+        } for (name, labels), count, total, p50, p95 in sorted(items)]
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            histograms = sorted((key, list(h.bucket_counts), h.count, h.sum) for key, h in self.histograms.items())
+            counters = sorted(self.counters.items())
+        typed = set()
+        for (name, labels), bucket_counts, count, total in histograms:
+            metric = f'heart_{name}_seconds'
+            if metric not in typed:
+                lines.append(f'# TYPE {metric} histogram')
+                typed.add(metric)
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ('+Inf',), bucket_counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{metric}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{metric}_count{_format_labels(labels)} {count}')
+        for (name, labels), value in counters:
+            metric = f'heart_{name}_total'
+            if metric not in typed:
+                lines.append(f'# TYPE {metric} counter')
+                typed.add(metric)
+            lines.append(f'{metric}{_format_labels(labels)} {value}')
+        for (name, labels), value in sorted(self.gauge_values().items()):
+            metric = f'heart_{name}'
+            if metric not in typed:
+                lines.append(f'# TYPE {metric} gauge')
+                typed.add(metric)
+            lines.append(f'{metric}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+class _Timer:
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        self.registry.observe(self.name, self.elapsed, **self.labels)
+        if exc_type is not None:
+            self.registry.count(f'{self.name}_errors', **self.labels)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(self.registry, self.name, self.labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+# Registry yang di-share oleh seluruh session dalam satu proses
+registry = MetricsRegistry()
+timer = registry.timer
+count = registry.count
+register_gauge = registry.register_gauge
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+# Waktu terakhir setiap session Streamlit menjalankan halaman, di-share oleh seluruh session dalam satu proses
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+# Mencatat session yang sedang menjalankan halaman; dipanggil di awal setiap halaman Streamlit
+def track_session():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    with _sessions_lock:
+        _sessions[ctx.session_id] = time.monotonic()
+
+
+# Jumlah session yang membuka halaman dalam SESSION_WINDOW detik terakhir.
+# Hanya perkiraan (best-effort): session yang ditutup tetap terhitung sampai window lewat,
+# dan session yang terbuka tanpa menjalankan ulang halaman tidak terhitung setelah window lewat.
+def active_sessions(window=SESSION_WINDOW):
+    cutoff = time.monotonic() - window
+    with _sessions_lock:
+        for session_id in [s for s, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[session_id]
+        return len(_sessions)
+
+
+# Menulis file Prometheus secara berkala di background (untuk node_exporter textfile collector)
+def start_file_exporter(path=METRICS_FILE, interval=METRICS_FILE_INTERVAL):
+    global _exporter
+    if not path or _exporter is not None:
+        return _exporter
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                registry.write_prometheus(path)
+            except OSError:
+                pass
+
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = threading.Thread(target=run, name='metrics-exporter', daemon=True)
+            _exporter.start()
+    return _exporter
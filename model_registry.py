@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from catboost import CatBoostClassifier
+
+from encoder import check_model_schema
+from metrics import register_gauge, timer
+
+# Registry model yang di-share untuk seluruh session dalam satu proses.
+# Model hanya di-load ulang ketika isi file .cbm berubah (dicek lewat mtime/size, lalu hash).
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, 'catboost_model_heart_disease.cbm')
+METRICS_PATH = os.path.join(BASE_DIR, 'model_metrics.json')
+
+_lock = threading.Lock()
+_entries = {}
+
+
+class ModelEntry:
+    def __init__(self, model, path, version, stat_key, load_time, file_size, rss_delta, schema_verified):
+        self.model = model
+        self.path = path
+        self.version = version
+        self.stat_key = stat_key
+        self.load_time = load_time
+        self.file_size = file_size
+        self.rss_delta = rss_delta
+        self.schema_verified = schema_verified
+        self.loaded_at = time.time()
+        self.hits = 0
+
+    def info(self):
+        return {
+            'path': self.path,
+            'version': self.version,
+            'load_time_ms': self.load_time * 1000,
+            'file_size_bytes': self.file_size,
+            'resident_size_bytes': self.rss_delta,
+            'schema_verified': self.schema_verified,
+            'loaded_at': self.loaded_at,
+            'hits': self.hits,
+        }
+
+
+# Fungsi untuk membaca RSS proses saat ini (hanya tersedia di Linux)
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+@timer('model_load')
+def _load(path, stat_key, version):
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    model = CatBoostClassifier()
+    model.load_model(path)
+    # Tolak model yang skema encoding-nya berbeda dengan encoder.py
+    schema_verified = check_model_schema(model)
+    load_time = time.perf_counter() - start
+    rss_after = rss_bytes()
+    rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+    return ModelEntry(model, path, version, stat_key, load_time, stat_key[1], rss_delta, schema_verified)
+
+
+# Fungsi untuk mengambil model beserta metadatanya (versi, waktu load, ukuran)
+def get_model_entry(path=MODEL_PATH):
+    path = os.path.abspath(path)
+    stat_key = _stat_key(path)
+    entry = _entries.get(path)
+    if entry is not None and entry.stat_key == stat_key:
+        entry.hits += 1
+        return entry
+
+    with _lock:
+        entry = _entries.get(path)
+        if entry is not None and entry.stat_key == stat_key:
+            entry.hits += 1
+            return entry
+
+        # mtime berubah, tapi bisa jadi isinya sama (misal file di-copy ulang)
+        version = _file_hash(path)
+        if entry is not None and entry.version == version:
+            entry.stat_key = stat_key
+        else:
+            entry = _load(path, stat_key, version)
+        _entries[path] = entry
+        entry.hits += 1
+        return entry
+
+
+# Fungsi untuk mengambil model catboost yang sudah di-load
+def get_model(path=MODEL_PATH):
+    return get_model_entry(path).model
+
+
+# Fungsi untuk menampilkan informasi seluruh model yang sedang di-load
+def registry_info():
+    return [entry.info() for entry in list(_entries.values())]
+
+
+register_gauge('process_resident_bytes', rss_bytes)
+register_gauge('models_loaded', lambda: len(_entries))
+
+
+# Fungsi untuk membaca metrics hasil training (ditulis oleh train.py)
+def load_metrics(path=METRICS_PATH):
+    with open(path) as f:
+        return json.load(f)
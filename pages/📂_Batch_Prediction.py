@@ -0,0 +1,61 @@
+import os
+
+import streamlit as st
+from batch_predict import RESULT_URL, new_result_path, predict_csv, start_result_cleaner
+from metrics import track_session
+from model_registry import get_model_entry
+
+st.set_page_config(
+    page_title="Batch Prediction",
+    page_icon="📂"
+)
+
+track_session()
+
+# File hasil lama dihapus di background (sekali per proses), tidak menunggu batch berikutnya
+start_result_cleaner()
+
+def show_batch_predict():
+    st.title('📂 Batch Prediction')
+    st.write('Upload file CSV dengan format yang sama seperti data.csv (contoh nilai kategori: ATA, Flat, LVH) untuk memprediksi banyak pasien sekaligus.')
+    st.write('Kolom wajib: Age, Sex, ChestPainType, RestingBP, Cholesterol, FastingBS, RestingECG, MaxHR, ExerciseAngina, Oldpeak, ST_Slope')
+
+    uploaded = st.file_uploader('Pilih file CSV', type='csv')
+    if uploaded is None:
+        return
+
+    with_shap = st.checkbox('Sertakan penjelasan per baris (kolom SHAP_<feature>)', help='Kontribusi setiap feature terhadap prediksi dalam log-odds. Proses lebih lama dibandingkan prediksi saja.')
+
+    if st.button('Predict'):
+        status = st.empty()
+        # Hasil ditulis ke file per chunk dan disajikan dari disk, supaya memori tetap terbatas berapa pun ukurannya
+        result_path = new_result_path()
+        try:
+            with open(result_path, 'w', newline='') as result_file:
+                total = predict_csv(uploaded, result_file, get_model_entry(),
+                                    progress=lambda n: status.write(f'⏳ {n:,} baris sudah diprediksi...'),
+                                    with_shap=with_shap)
+        except ValueError as e:
+            os.remove(result_path)
+            st.error(f'File tidak valid: {e}')
+            return
+        except BaseException:
+            # File hasil parsial berisi data pasien dan berada di folder yang disajikan publik
+            if os.path.exists(result_path):
+                os.remove(result_path)
+            raise
+
+        status.success(f'✅ {total:,} baris berhasil diprediksi')
+        show_download(result_path)
+
+def show_download(result_path):
+    if st.get_option('server.enableStaticServing'):
+        url = f'{RESULT_URL}/{os.path.basename(result_path)}'
+        st.markdown(f'<a href="{url}" download="hasil_prediksi.csv">📥 Download hasil prediksi</a>', unsafe_allow_html=True)
+        return
+    # Tanpa static serving, st.download_button membaca seluruh file ke memori
+    st.caption('Aktifkan server.enableStaticServing supaya file hasil yang besar tidak dimuat ke memori.')
+    with open(result_path, 'rb') as f:
+        st.download_button('Download hasil prediksi', data=f, file_name='hasil_prediksi.csv', mime='text/csv')
+
+show_batch_predict()
@@ -0,0 +1,81 @@
+import pickle
+
+import pandas as pd
+import streamlit as st
+from metrics import SESSION_WINDOW, active_sessions, registry, track_session
+from model_registry import registry_info, rss_bytes
+
+st.set_page_config(
+    page_title="Performance",
+    page_icon="📈"
+)
+
+track_session()
+
+# Perkiraan ukuran session_state session ini (hanya nilai yang bisa di-pickle)
+def session_state_bytes():
+    total = 0
+    for key in list(st.session_state.keys()):
+        try:
+            total += len(pickle.dumps(st.session_state[key]))
+        except Exception:
+            pass
+    return total
+
+def format_bytes(value):
+    if value is None:
+        return '-'
+    return f'{value / 1024 / 1024:.1f} MB' if value >= 1024 * 1024 else f'{value / 1024:.1f} KB'
+
+def show_performance():
+    st.title('📈 Performance')
+    st.write('Latensi setiap tahap (model, data, grafik, prediksi) sejak proses ini berjalan. p50/p95 dihitung dari 2048 sampel terakhir.')
+
+    summary = registry.summary()
+    if summary:
+        table = pd.DataFrame([{
+            'Tahap': row['name'],
+            'Label': ', '.join(f'{k}={v}' for k, v in row['labels'].items()),
+            'Jumlah': row['count'],
+            'p50 (ms)': row['p50_ms'],
+            'p95 (ms)': row['p95_ms'],
+            'Rata-rata (ms)': row['mean_ms'],
+        } for row in summary])
+        st.dataframe(table.style.format({'p50 (ms)': '{:.2f}', 'p95 (ms)': '{:.2f}', 'Rata-rata (ms)': '{:.2f}'}), hide_index=True)
+    else:
+        st.info('Belum ada data. Buka halaman lain atau lakukan prediksi terlebih dahulu.')
+
+    st.subheader('🧠 Cache')
+    gauges = {name: fn() for name, fn in registry.gauges.items()}
+    rows = []
+    for name in ('prediction_cache', 'explanation_cache', 'what_if_cache', 'what_if_figure_cache', 'figure_cache'):
+        stats = gauges.get(name)
+        if not stats:
+            continue
+        hits = stats.get('hits', 0) + stats.get('disk_hits', 0)
+        lookups = hits + stats.get('misses', 0)
+        rows.append({
+            'Cache': name,
+            'Isi': stats.get('entries', stats.get('items')),
+            'Hits': hits,
+            'Misses': stats.get('misses', 0),
+            'Hit rate': f'{hits / lookups * 100:.1f}%' if lookups else '-',
+        })
+    st.dataframe(pd.DataFrame(rows), hide_index=True)
+
+    st.subheader('💾 Memori')
+    rss = rss_bytes()
+    sessions = active_sessions()
+    col1, col2, col3 = st.columns(3)
+    col1.metric('RSS proses', format_bytes(rss))
+    col2.metric('Session aktif', sessions,
+                help=f'Perkiraan: session yang membuka halaman aplikasi dalam {SESSION_WINDOW / 60:.0f} menit terakhir')
+    col3.metric('RSS per session', format_bytes(rss / sessions) if rss is not None and sessions else '-')
+    st.caption(f'Ukuran session_state session ini: {format_bytes(session_state_bytes())}')
+    for info in registry_info():
+        st.caption(f"Model {info['version']}: load {info['load_time_ms']:.1f} ms, memori {format_bytes(info['resident_size_bytes'])}, dipakai {info['hits']:,} kali")
+
+    st.download_button('Download metrics (format Prometheus)', data=registry.prometheus_text(),
+                       file_name='heart_metrics.prom', mime='text/plain')
+
+show_performance()
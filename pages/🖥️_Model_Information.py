@@ -1,31 +1,29 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
 import numpy as np
+from matplotlib.figure import Figure
+from explain import draw_global_importance, global_importance
+from figure_cache import figure_cache
+from metrics import track_session
+from model_registry import get_model_entry, load_metrics
 
 st.set_page_config(
     page_title="Model Information",
     page_icon="🖥️"
 )
 
-def show_model_information():
-    st.title('🖥️ Model Information')
-    st.write('Saya mencoba 5 model untuk memprediksi penyakit jantung, yaitu:')
-    st.write('1. Logistic Regression')
-    st.write('2. Gradient Boosting Classifier')
-    st.write('3. CatBoost Classifier')
-    st.write('4. Naive Bayes')
-    st.write('5. XGBoost Classifier')
-
-    st.subheader('📈 Berikut adalah akurasi dari setiap model')
+track_session()
 
-    nama_model = ['Logistic Regression', 'Gradient Boosting', 'CatBoost', 'Naive Bayes', 'XGBoost']
-    accTrainArr = [0.8542234332425068, 0.946866485013624, 0.946866485013624, 0.8365122615803815, 0.9373297002724795]
-    accTestArr = [0.8913043478260869, 0.8967391304347826, 0.907608695652174, 0.8858695652173914, 0.8804347826086957]
+# Nama lengkap model pada daftar model (nama lain ditampilkan apa adanya)
+MODEL_LABELS = {
+    'Gradient Boosting': 'Gradient Boosting Classifier',
+    'CatBoost': 'CatBoost Classifier',
+    'XGBoost': 'XGBoost Classifier',
+}
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+# Fungsi untuk menggambar grafik perbandingan akurasi setiap model
+def draw_accuracy_chart(nama_model, accTrainArr, accTestArr):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
 
     # Lebar setiap bar
     bar_width = 0.4
@@ -58,11 +56,38 @@ def show_model_information():
     ax.set_ylim(0, 1.05)
 
     ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+    return fig
+
+def show_model_information():
+    st.title('🖥️ Model Information')
+
+    # Daftar model dan akurasinya dibaca dari model_metrics.json yang dihasilkan oleh train.py
+    metrics = load_metrics()
+    models = metrics['models']
+    st.write(f'Saya mencoba {len(models)} model untuk memprediksi penyakit jantung, yaitu:')
+    for i, m in enumerate(models, start=1):
+        st.write(f"{i}. {MODEL_LABELS.get(m['name'], m['name'])}")
 
-    st.pyplot(fig)
+    st.subheader('📈 Berikut adalah akurasi dari setiap model')
 
-    st.write('Tampak bahwa model Catboost menghasilkan akurasi tertinggi ketika memprediksi data test. Selain itu, akurasinya pun tidak jauh berbeda dengan akurasi data train.')
-    st.write('Hal tersebut menunjukkan bahwa model Catboost tidak overfitting dan tidak underfitting, serta lebih baik dibandingkan model yang lain.')
+    nama_model = [m['name'] for m in metrics['models']]
+    accTrainArr = [m['train_accuracy'] for m in metrics['models']]
+    accTestArr = [m['test_accuracy'] for m in metrics['models']]
+
+    # Grafik hanya di-render ulang jika nilai akurasinya berubah
+    version = (tuple(nama_model), tuple(accTrainArr), tuple(accTestArr))
+    png = figure_cache.get_or_render('model_accuracy', version, lambda: draw_accuracy_chart(nama_model, accTrainArr, accTestArr))
+    st.image(png)
+
+    # Kesimpulan dihitung dari hasil training terakhir, bukan ditulis tetap
+    best = max(models, key=lambda m: m['test_accuracy'])
+    selected = next((m for m in models if m['name'] == metrics.get('selected_model')), None)
+    st.write(f"Tampak bahwa model {best['name']} menghasilkan akurasi tertinggi ketika memprediksi data test ({best['test_accuracy']:.3f}).")
+    if selected is best:
+        gap = selected['train_accuracy'] - selected['test_accuracy']
+        st.write(f"Selisih akurasi data train dan data test model {best['name']} hanya {gap:.3f}, sehingga model tidak overfitting dan tidak underfitting, serta lebih baik dibandingkan model yang lain.")
+    elif selected is not None:
+        st.write(f"Model yang dipakai aplikasi adalah {selected['name']} dengan akurasi data test {selected['test_accuracy']:.3f}.")
 
     st.subheader('😺 Alasan memilih Catboost')
 
@@ -74,4 +99,17 @@ def show_model_information():
 
     st.write('Berdasarkan berbagai alasan tersebut, saya memilih model Catboost untuk memprediksi data yang diinputkan oleh user.')
 
+    # Informasi model yang sedang dipakai oleh proses ini
+    entry = get_model_entry()
+
+    st.subheader('🔍 Feature yang paling berpengaruh')
+    st.write('Rata-rata besar kontribusi (SHAP value) setiap feature terhadap prediksi model pada seluruh data. Semakin panjang bar, semakin besar pengaruh feature tersebut.')
+    # Dihitung sekali per versi model, grafiknya juga di-cache per versi model
+    png = figure_cache.get_or_render('global_importance', entry.version, lambda: draw_global_importance(global_importance(entry)))
+    st.image(png)
+
+    info = entry.info()
+    resident = f"{info['resident_size_bytes'] / 1024:.0f} KB" if info['resident_size_bytes'] is not None else '-'
+    st.caption(f"Versi model: {info['version']} | Waktu load: {info['load_time_ms']:.1f} ms | Ukuran file: {info['file_size_bytes'] / 1024:.0f} KB | Memori: {resident}")
+
 show_model_information()
\ No newline at end of file
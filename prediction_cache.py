@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import count, register_gauge, timer
+from model_registry import MODEL_PATH, get_model_entry
+
+# Cache hasil prediksi yang di-share oleh seluruh session, batch prediction, dan scoring server.
+# Input form berupa slider integer dan pilihan kategori, sehingga vektor feature yang sama sering muncul lagi.
+# Key cache adalah tuple 11 feature yang sudah di-encode + versi model (hash file .cbm),
+# jadi ketika file model berubah, hasil lama otomatis tidak dipakai dan cache dikosongkan.
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get('HEART_PREDICTION_CACHE_SIZE', 100_000))
+DEFAULT_TTL = float(os.environ.get('HEART_PREDICTION_CACHE_TTL', 3600))
+# Batch yang lebih besar dari ini (misalnya upload Batch Prediction) langsung dikirim ke model tanpa cache:
+# baris data nyata hampir selalu unik, jadi lookup per baris hanya menambah waktu dan mengusir entry
+# milik form, what-if, dan scoring server (micro-batch maksimal 512 baris)
+DEFAULT_MAX_BATCH = int(os.environ.get('HEART_PREDICTION_CACHE_MAX_BATCH', 1024))
+
+
+# Fungsi untuk mencari baris unik; setiap baris dilihat sebagai satu nilai bytes (jauh lebih cepat dari np.unique axis=0)
+def _unique_rows(X):
+    rows = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+    _, index, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return X[index], inverse.ravel()
+
+
+def _positive_proba(model, X):
+    return model.predict_proba(X)[:, 1]
+
+
+class PredictionCache:
+    def __init__(self, name='prediction', max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, max_batch=DEFAULT_MAX_BATCH):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_batch = max_batch
+        self.bypassed_rows = 0
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Mengosongkan cache jika versi model berbeda dengan versi hasil yang tersimpan
+    def _check_version(self, version):
+        if version != self.model_version:
+            if self._items:
+                self.invalidations += 1
+            self._items.clear()
+            self.model_version = version
+
+    def _lookup(self, keys, version, now):
+        found = {}
+        with self._lock:
+            self._check_version(version)
+            for key in keys:
+                item = self._items.get((version, key))
+                if item is None:
+                    continue
+                proba, expires_at = item
+                if expires_at < now:
+                    del self._items[(version, key)]
+                    self.expirations += 1
+                    continue
+                self._items.move_to_end((version, key))
+                found[key] = proba
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def _store(self, keys, probas, version, now):
+        expires_at = now + self.ttl
+        with self._lock:
+            self._check_version(version)
+            for key, proba in zip(keys, probas):
+                self._items[(version, key)] = (proba, expires_at)
+                self._items.move_to_end((version, key))
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    # Cache hanya dipakai untuk batch kecil yang muat di cache
+    def _cacheable(self, X):
+        return len(X) <= min(self.max_batch, self.max_entries)
+
+    # Panggilan model yang sebenarnya, diukur per cache (prediction/explanation)
+    def _compute(self, entry, X, compute):
+        count('model_rows', len(X), cache=self.name)
+        with timer('model_call', cache=self.name):
+            return compute(entry.model, X)
+
+    # Mengambil nilai per baris X dari cache, baris unik yang belum ada dihitung dengan compute(model, X)
+    # dalam satu panggilan. compute harus mengembalikan array dengan satu elemen/baris per baris input.
+    def get_or_compute(self, entry, X, compute):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if not self._cacheable(X):
+            self.bypassed_rows += len(X)
+            return self._compute(entry, X, compute)
+
+        unique, inverse = _unique_rows(X)
+        keys = [tuple(row) for row in unique.tolist()]
+        now = time.monotonic()
+        found = self._lookup(keys, entry.version, now)
+
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        values = [found.get(key) for key in keys]
+        if missing:
+            computed = self._compute(entry, unique[missing], compute)
+            for i, value in zip(missing, computed):
+                values[i] = value
+            self._store([keys[i] for i in missing], list(computed), entry.version, now)
+        return np.asarray(values)[inverse]
+
+    # Menyimpan nilai yang sudah dihitung di tempat lain tanpa memanggil model
+    # (misalnya probabilitas dari SHAP values pada explain(), supaya form ikut mengisi cache yang sama)
+    # Batch besar tidak disimpan, sama seperti pada get_or_compute
+    def put(self, entry, X, values):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if not self._cacheable(X):
+            return
+        keys = [tuple(row) for row in X.tolist()]
+        self._store(keys, list(np.asarray(values)), entry.version, time.monotonic())
+
+    # Fungsi utama: probabilitas kelas positif untuk setiap baris X (hasil encoder)
+    # Hanya baris unik yang belum ada di cache yang dikirim ke model, dalam satu panggilan predict_proba
+    def predict_proba(self, entry, X):
+        return self.get_or_compute(entry, X, _positive_proba)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._items),
+            'max_entries': self.max_entries,
+            'max_batch': self.max_batch,
+            'bypassed_rows': self.bypassed_rows,
+            'ttl_seconds': self.ttl,
+            'model_version': self.model_version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
+
+
+# Cache yang di-share oleh seluruh session dalam satu proses
+prediction_cache = PredictionCache()
+register_gauge('prediction_cache', prediction_cache.stats)
+
+
+# Fungsi untuk memprediksi probabilitas lewat cache, model diambil dari registry (ikut hot-swap)
+def predict_proba(X, path=MODEL_PATH):
+    entry = get_model_entry(path)
+    return prediction_cache.predict_proba(entry, X), entry.version
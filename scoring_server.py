@@ -0,0 +1,200 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from encoder import encode_records
+from metrics import registry, timer
+from model_registry import get_model_entry
+from prediction_cache import prediction_cache
+
+# Server HTTP ringan untuk scoring tanpa Streamlit.
+# Memakai model dari model_registry dan encoding dari encoder (sama dengan aplikasi Streamlit).
+#
+# Endpoint:
+#   POST /predict        -> satu record dengan skema data.csv
+#   POST /predict/batch  -> list record (atau {"records": [...]})
+#   GET  /health
+#   GET  /metrics        -> metrics format teks Prometheus
+
+
+class _Job:
+    def __init__(self, X):
+        self.X = X
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Mengelompokkan request yang datang bersamaan menjadi satu panggilan predict_proba
+class MicroBatcher:
+    def __init__(self, predict_fn, max_batch=512, max_wait_ms=2.0):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        job = _Job(X)
+        self._queue.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _collect(self):
+        jobs = [self._queue.get()]
+        rows = len(jobs[0].X)
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            rows += len(job.X)
+        return jobs
+
+    def _run(self):
+        while True:
+            jobs = self._collect()
+            try:
+                X = jobs[0].X if len(jobs) == 1 else np.vstack([job.X for job in jobs])
+                result = self.predict_fn(X)
+                self.batches += 1
+                self.rows += len(X)
+                start = 0
+                for job in jobs:
+                    job.result = result[start:start + len(job.X)]
+                    start += len(job.X)
+            except Exception as e:
+                for job in jobs:
+                    job.error = e
+            for job in jobs:
+                job.done.set()
+
+
+# Fungsi prediksi untuk micro-batcher, model diambil dari registry supaya hot-swap tetap berlaku
+# Vektor feature yang sudah pernah diprediksi diambil dari prediction_cache
+def predict_rows(X):
+    entry = get_model_entry()
+    proba = prediction_cache.predict_proba(entry, X)
+    return [(p, entry.version) for p in proba]
+
+
+def _format(result):
+    return [{'prediction': int(p > 0.5), 'probability': float(p), 'model_version': version}
+            for p, version in result]
+
+
+def make_handler(batcher):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get('Content-Length', 0))
+            return json.loads(self.rfile.read(length) or b'null')
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                body = registry.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif self.path == '/health':
+                self._send(200, {'status': 'ok', 'batches': batcher.batches, 'rows': batcher.rows,
+                                 'prediction_cache': prediction_cache.stats()})
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path not in ('/predict', '/predict/batch'):
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                payload = self._read_json()
+                if self.path == '/predict':
+                    if not isinstance(payload, dict):
+                        raise ValueError('Body harus berupa satu object JSON')
+                    records = [payload]
+                else:
+                    records = payload.get('records') if isinstance(payload, dict) else payload
+                    if not isinstance(records, list) or not records:
+                        raise ValueError('Body harus berupa list record yang tidak kosong')
+                X = encode_records(records)
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+
+            try:
+                with timer('http_predict', path=self.path):
+                    results = _format(batcher.submit(X))
+            except Exception as e:
+                # Error dari worker (load model / predict) dikirim sebagai 500, bukan koneksi yang terputus.
+                # Jumlahnya tercatat di counter http_predict_errors oleh timer di atas
+                self._send(500, {'error': f'Prediksi gagal: {e}'})
+                return
+            if self.path == '/predict':
+                self._send(200, results[0])
+            else:
+                self._send(200, {'predictions': results})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Backlog default (5) terlalu kecil untuk banyak koneksi bersamaan
+    request_queue_size = 256
+
+
+def make_server(host='127.0.0.1', port=8000, max_batch=512, max_wait_ms=2.0):
+    get_model_entry()
+    batcher = MicroBatcher(predict_rows, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    return ScoringServer((host, port), make_handler(batcher))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Server HTTP untuk prediksi penyakit jantung')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch', type=int, default=512, help='Jumlah baris maksimal per micro-batch')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help='Waktu tunggu maksimal untuk mengumpulkan micro-batch')
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.max_batch, args.max_wait_ms)
+    print(f'Scoring server berjalan di http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from tree_engine import CompiledEnsemble
+
+# Artifact serving yang ringkas untuk model CatBoost (oblivious tree), bisa dievaluasi tanpa import catboost.
+# - threshold di-quantize: setiap split disimpan sebagai (index fitur, index border) uint8,
+#   border float32 setiap fitur disimpan sekali; input di-quantize menjadi bin dengan searchsorted
+# - leaf disimpan dalam float32 atau float16
+# - seluruh isi berada dalam satu file biner yang contiguous dan bisa di-memory-map
+#
+# Layout file: MAGIC (8 byte) | panjang header (uint32 little-endian) | header JSON | array (rata 64 byte)
+# Contoh export: python serving_artifact.py --leaf-dtype float16
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, 'catboost_model_heart_disease.cbm')
+ARTIFACT_PATH = os.path.join(BASE_DIR, 'catboost_model_heart_disease.qbin')
+
+MAGIC = b'HEARTQB1'
+ALIGNMENT = 64
+# Index border 255 dipakai untuk level pohon yang tidak terpakai (bit selalu 0)
+UNUSED_BIN = 255
+LEAF_DTYPES = ('float32', 'float16')
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+# Fungsi untuk meng-quantize CompiledEnsemble: border unik per fitur + index border setiap split
+def quantize(engine):
+    n_features = len(engine.feature_names)
+    used = engine.thresholds < np.inf
+    borders = []
+    for j in range(n_features):
+        values = np.unique(engine.thresholds[used & (engine.split_features == j)])
+        if len(values) >= UNUSED_BIN:
+            raise ValueError(f'Fitur {engine.feature_names[j]} memiliki lebih dari {UNUSED_BIN - 1} border')
+        borders.append(values.astype(np.float32))
+
+    split_bins = np.full(engine.thresholds.shape, UNUSED_BIN, dtype=np.uint8)
+    for j, values in enumerate(borders):
+        mask = used & (engine.split_features == j)
+        split_bins[mask] = np.searchsorted(values, engine.thresholds[mask])
+    border_offsets = np.concatenate([[0], np.cumsum([len(values) for values in borders])]).astype(np.int32)
+    border_flat = np.concatenate(borders) if borders else np.zeros(0, dtype=np.float32)
+    return border_flat, border_offsets, engine.split_features.astype(np.uint8), split_bins
+
+
+# Fungsi untuk menulis artifact dari model CatBoost (path .cbm atau objek model)
+def export(model_or_path=MODEL_PATH, path=ARTIFACT_PATH, leaf_dtype='float16'):
+    from tree_engine import compile_model
+
+    if leaf_dtype not in LEAF_DTYPES:
+        raise ValueError(f'leaf_dtype harus salah satu dari {LEAF_DTYPES}')
+    engine = compile_model(model_or_path)
+    border_flat, border_offsets, split_features, split_bins = quantize(engine)
+    arrays = {
+        'borders': border_flat,
+        'border_offsets': border_offsets,
+        'split_features': split_features,
+        'split_bins': split_bins,
+        'leaf_values': engine.leaf_values.astype(leaf_dtype),
+    }
+
+    header = {
+        'feature_names': engine.feature_names,
+        'tree_count': engine.tree_count,
+        'depth': engine.depth,
+        'scale': engine.scale,
+        'bias': engine.bias,
+        'source_version': _file_hash(model_or_path) if isinstance(model_or_path, str) else None,
+        'arrays': {},
+    }
+    # Offset array dihitung relatif terhadap awal bagian data, supaya header bisa ditulis sekali
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        header['arrays'][name] = {'offset': offset, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint32(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b'\0' * (data_start + header['arrays'][name]['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+class ServingModel:
+    def __init__(self, path=ARTIFACT_PATH):
+        self.path = path
+        # Seluruh file di-memory-map, array di bawah ini adalah view ke file tersebut (tanpa copy)
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(self._buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f'{path} bukan artifact serving yang valid')
+        header_len = int(np.frombuffer(self._buffer, dtype='<u4', count=1, offset=len(MAGIC))[0])
+        header_start = len(MAGIC) + 4
+        header = json.loads(bytes(self._buffer[header_start:header_start + header_len]))
+        data_start = _align(header_start + header_len)
+
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            shape = tuple(spec['shape'])
+            arrays[name] = np.frombuffer(self._buffer, dtype=spec['dtype'], count=int(np.prod(shape)),
+                                         offset=data_start + spec['offset']).reshape(shape)
+
+        self.feature_names = header['feature_names']
+        self.source_version = header['source_version']
+        self.leaf_dtype = arrays['leaf_values'].dtype
+        offsets = arrays['border_offsets']
+        self._borders = [arrays['borders'][offsets[j]:offsets[j + 1]] for j in range(len(self.feature_names))]
+
+        # Evaluasi dilakukan oleh CompiledEnsemble pada input yang sudah menjadi bin:
+        # fitur > border ke-k  <=>  bin > k  <=>  bin > k + 0.5
+        thresholds = np.where(arrays['split_bins'] == UNUSED_BIN, np.inf, arrays['split_bins'] + 0.5)
+        self.engine = CompiledEnsemble(arrays['split_features'], thresholds, arrays['leaf_values'],
+                                       header['scale'], header['bias'], self.feature_names)
+
+    # Mengubah nilai fitur menjadi bin: jumlah border yang lebih kecil dari nilai tersebut
+    def quantize(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        bins = np.empty(X.shape, dtype=np.float32)
+        for j, borders in enumerate(self._borders):
+            # NaN selalu masuk bin 0, sama dengan CompiledEnsemble (perbandingan dengan NaN bernilai False)
+            column = np.where(np.isnan(X[:, j]), -np.inf, X[:, j])
+            bins[:, j] = np.searchsorted(borders, column, side='left')
+        return bins
+
+    def raw_predict(self, X):
+        return self.engine.raw_predict(self.quantize(X))
+
+    def predict_proba(self, X):
+        return self.engine.predict_proba(self.quantize(X))
+
+    def predict(self, X):
+        return self.engine.predict(self.quantize(X))
+
+
+def load(path=ARTIFACT_PATH):
+    return ServingModel(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export model CatBoost menjadi artifact serving yang ringkas')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--out', default=ARTIFACT_PATH)
+    parser.add_argument('--leaf-dtype', choices=LEAF_DTYPES, default='float16')
+    args = parser.parse_args()
+
+    export(args.model, args.out, args.leaf_dtype)
+    print(f'{args.model} ({os.path.getsize(args.model):,} byte) -> {args.out} ({os.path.getsize(args.out):,} byte)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from encoder import CATEGORY_MAPS, FEATURE_NAMES, LOOKUP_TABLES, TARGET
+
+# Snapshot lokal spktable/data.csv dalam format kolom (satu file .npy per kolom).
+# Kategori disimpan sebagai kode int8 (sama dengan kode encoder), vital sign sebagai int16/float32.
+# File .npy dibuka dengan memory mapping sehingga load bersifat zero-copy dan hanya kolom
+# yang dibutuhkan yang dibaca dari disk. Setiap snapshot punya versi (hash isi) untuk key cache.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.environ.get('HEART_SNAPSHOT_DIR', os.path.join(BASE_DIR, 'snapshots'))
+CSV_PATH = os.path.join(BASE_DIR, 'data.csv')
+LATEST_FILE = 'LATEST'
+
+COLUMN_DTYPES = {
+    'Age': np.int16,
+    'Sex': np.int8,
+    'ChestPainType': np.int8,
+    'RestingBP': np.int16,
+    'Cholesterol': np.int16,
+    'FastingBS': np.int8,
+    'RestingECG': np.int8,
+    'MaxHR': np.int16,
+    'ExerciseAngina': np.int8,
+    'Oldpeak': np.float32,
+    'ST_Slope': np.int8,
+    TARGET: np.int8,
+}
+
+# Filter yang dipakai halaman Analysis Insights
+INSIGHTS_FILTERS = [
+    ('Cholesterol', '>', 50), ('Cholesterol', '<', 350),
+    ('RestingBP', '>', 90), ('RestingBP', '<', 180),
+    ('Oldpeak', '>=', 0),
+]
+
+_OPERATORS = {
+    '>': np.greater, '>=': np.greater_equal,
+    '<': np.less, '<=': np.less_equal,
+    '==': np.equal, '!=': np.not_equal,
+}
+
+
+# Fungsi untuk mengubah satu chunk DataFrame (skema data.csv) menjadi array bertipe compact
+def encode_columns(df):
+    columns = {}
+    for col, dtype in COLUMN_DTYPES.items():
+        if col in LOOKUP_TABLES:
+            values = LOOKUP_TABLES[col].encode(col, df[col].to_numpy())
+        else:
+            values = pd.to_numeric(df[col], errors='raise').to_numpy()
+        columns[col] = values.astype(dtype)
+    return columns
+
+
+# Fungsi untuk menulis snapshot dari kumpulan chunk DataFrame, lalu menandainya sebagai snapshot terbaru
+# Setiap chunk langsung ditulis ke file .npy masing-masing kolom (di folder staging), sehingga memori
+# yang dipakai hanya sebesar satu chunk. Header .npy ditulis ulang dengan jumlah baris akhir setelah chunk terakhir.
+def write_snapshot(chunks, root=SNAPSHOT_DIR, source=None):
+    staging = os.path.join(root, f'.staging-{os.getpid()}')
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        files = {col: open(os.path.join(staging, f'{col}.npy'), 'wb') for col in COLUMN_DTYPES}
+        try:
+            headers = {col: _write_header(f, COLUMN_DTYPES[col], 0) for col, f in files.items()}
+            digests = {col: hashlib.sha256() for col in COLUMN_DTYPES}
+            rows = 0
+            for chunk in chunks:
+                for col, values in encode_columns(chunk).items():
+                    data = np.ascontiguousarray(values).tobytes()
+                    files[col].write(data)
+                    digests[col].update(data)
+                rows += len(chunk)
+            for col, f in files.items():
+                f.seek(0)
+                if _write_header(f, COLUMN_DTYPES[col], rows) != headers[col]:
+                    raise RuntimeError(f'Ukuran header .npy kolom {col} berubah')
+        finally:
+            for f in files.values():
+                f.close()
+
+        digest = hashlib.sha256()
+        for col in COLUMN_DTYPES:
+            digest.update(col.encode('utf-8'))
+            digest.update(digests[col].digest())
+        version = digest.hexdigest()[:16]
+
+        meta = {
+            'version': version,
+            'rows': rows,
+            'source': source,
+            'dtypes': {col: np.dtype(dtype).name for col, dtype in COLUMN_DTYPES.items()},
+            'categories': CATEGORY_MAPS,
+        }
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        path = os.path.join(root, version)
+        # Snapshot dengan isi yang sama sudah ada, cukup tandai sebagai snapshot terbaru
+        if os.path.exists(path):
+            shutil.rmtree(staging)
+        else:
+            os.replace(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    tmp_path = os.path.join(root, f'{LATEST_FILE}.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(root, LATEST_FILE))
+    return Snapshot(path)
+
+
+# Fungsi untuk menulis header .npy 1D dengan jumlah baris tertentu, mengembalikan panjang header
+# Header .npy selalu di-padding ke kelipatan 64 byte, jadi panjangnya sama untuk 0 maupun jutaan baris
+def _write_header(f, dtype, rows):
+    start = f.tell()
+    np.lib.format.write_array_header_1_0(f, {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                                             'fortran_order': False, 'shape': (rows,)})
+    return f.tell() - start
+
+
+# Fungsi untuk membuat snapshot dari file CSV (dibaca per chunk)
+def build_from_csv(path=CSV_PATH, root=SNAPSHOT_DIR, chunksize=500_000):
+    return write_snapshot(pd.read_csv(path, chunksize=chunksize), root, source=os.path.basename(path))
+
+
+# Fungsi untuk membuat snapshot dari tabel database
+def build_from_sql(engine, table='spktable', root=SNAPSHOT_DIR, chunksize=500_000):
+    from sqlalchemy import text
+
+    def chunks():
+        columns = ', '.join(f'"{col}"' for col in COLUMN_DTYPES)
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(text(f'SELECT {columns} FROM {table}'))
+            while True:
+                rows = result.fetchmany(chunksize)
+                if not rows:
+                    break
+                yield pd.DataFrame([tuple(row) for row in rows], columns=list(COLUMN_DTYPES))
+
+    return write_snapshot(chunks(), root, source=table)
+
+
+class Snapshot:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.version = self.meta['version']
+        self.rows = self.meta['rows']
+        self._labels = {col: np.array(list(mapping.keys()), dtype=object)
+                        for col, mapping in self.meta['categories'].items()}
+        self._codes = {col: np.array(list(mapping.values()))
+                       for col, mapping in self.meta['categories'].items()}
+
+    # Mengambil satu kolom lewat memory mapping (tidak menyalin data ke memori)
+    def column(self, name):
+        return np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+
+    # Fungsi untuk membuat mask dari filter, contoh: [('Cholesterol', '>', 50), ('Sex', 'in', [1])]
+    def mask(self, filters):
+        mask = np.ones(self.rows, dtype=bool)
+        for col, op, value in filters:
+            values = self.column(col)
+            if op == 'in':
+                mask &= np.isin(values, value)
+            else:
+                mask &= _OPERATORS[op](values, value)
+        return mask
+
+    # Fungsi untuk mengambil beberapa kolom saja (projection) dengan filter opsional
+    # Tanpa filter, array yang dikembalikan adalah memory map (zero-copy)
+    def load(self, columns=None, filters=None):
+        columns = list(COLUMN_DTYPES) if columns is None else columns
+        mask = self.mask(filters) if filters else None
+        return {col: self.column(col) if mask is None else self.column(col)[mask] for col in columns}
+
+    # Fungsi untuk mengubah kode kategori kembali menjadi label data.csv (misalnya 1 -> 'M')
+    def decode(self, col, codes):
+        if col not in self._labels:
+            return codes
+        order = np.argsort(self._codes[col])
+        positions = np.searchsorted(self._codes[col], codes, sorter=order)
+        return self._labels[col][order][positions]
+
+    def to_frame(self, columns=None, filters=None, decode=False):
+        data = self.load(columns, filters)
+        if decode:
+            data = {col: self.decode(col, np.asarray(values)) for col, values in data.items()}
+        return pd.DataFrame(data)
+
+    # Matrix feature untuk model, urutan kolom sama dengan FEATURE_NAMES
+    def features(self, filters=None):
+        data = self.load(FEATURE_NAMES + [TARGET], filters)
+        X = np.column_stack([np.asarray(data[col], dtype=np.float64) for col in FEATURE_NAMES])
+        return X, np.asarray(data[TARGET])
+
+
+# Fungsi untuk membuka snapshot terbaru (None jika belum pernah dibuat)
+def open_snapshot(root=SNAPSHOT_DIR, version=None):
+    if version is None:
+        try:
+            with open(os.path.join(root, LATEST_FILE)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+    return Snapshot(os.path.join(root, version))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Membuat snapshot kolom dari data.csv atau spktable')
+    parser.add_argument('--source', choices=['csv', 'db'], default='csv')
+    parser.add_argument('--csv', default=CSV_PATH, help='Path file CSV jika --source csv')
+    parser.add_argument('--root', default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    if args.source == 'csv':
+        snapshot = build_from_csv(args.csv, args.root)
+    else:
+        from data_access import get_engine
+        snapshot = build_from_sql(get_engine(), root=args.root)
+    print(f'Snapshot {snapshot.version} ({snapshot.rows:,} baris) tersimpan di {snapshot.path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+import argparse
+import io
+import os
+import sys
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from encoder import CATEGORY_MAPS, FEATURE_NAMES, LOOKUP_TABLES, TARGET
+
+# Generator data sintetis dengan skema data.csv untuk load test (Insights, agregasi, batch prediction).
+# Distribusi di-fit per kelas HeartDisease dengan Gaussian copula:
+# - marginal setiap kolom = distribusi empiris data.csv (kategori memakai kode encoder)
+# - hubungan antar kolom = matriks korelasi dari normal score setiap kolom
+# Sampling dilakukan per chunk dengan NumPy, sehingga jutaan baris bisa di-stream ke CSV/Parquet/database.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, 'data.csv')
+COLUMNS = FEATURE_NAMES + [TARGET]
+CHUNK_SIZE = 500_000
+DEFAULT_SEED = 92
+
+
+# CDF distribusi normal standar (aproksimasi Abramowitz-Stegun 7.1.26, error < 1.5e-7)
+def _normal_cdf(z):
+    x = np.abs(z) / np.sqrt(2)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-x * x)
+    return 0.5 * (1.0 + np.sign(z) * erf)
+
+
+# Normal score setiap nilai berdasarkan ranking (nilai yang sama mendapat rank rata-rata)
+def _normal_scores(values):
+    ranks = pd.Series(values).rank(method='average').to_numpy()
+    inv_cdf = NormalDist().inv_cdf
+    return np.array([inv_cdf(r / (len(values) + 1)) for r in ranks])
+
+
+# Matriks korelasi dibuat positive definite supaya bisa di-Cholesky (kolom konstan -> korelasi 0)
+def _cholesky(corr):
+    corr = np.nan_to_num(corr)
+    np.fill_diagonal(corr, 1.0)
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    corr = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(corr))
+    return np.linalg.cholesky(corr / np.outer(scale, scale))
+
+
+class SyntheticModel:
+    def __init__(self, classes, priors, sorted_values, factors, dtypes):
+        self.classes = classes
+        self.priors = priors
+        self.sorted_values = sorted_values
+        self.factors = factors
+        self.dtypes = dtypes
+        # Kolom kategori dibuat sebagai pd.Categorical (kode encoder -> posisi label), tanpa membuat jutaan string
+        self.categories = {}
+        for col, mapping in CATEGORY_MAPS.items():
+            positions = np.full(max(mapping.values()) + 1, -1, dtype=np.int8)
+            positions[list(mapping.values())] = np.arange(len(mapping))
+            self.categories[col] = (list(mapping.keys()), positions)
+
+    @classmethod
+    def fit(cls, df):
+        X = np.column_stack([LOOKUP_TABLES[col].encode(col, df[col].to_numpy()) if col in LOOKUP_TABLES
+                             else pd.to_numeric(df[col]).to_numpy(dtype=np.float64) for col in FEATURE_NAMES])
+        y = df[TARGET].to_numpy()
+        classes = np.unique(y)
+        priors = np.array([(y == c).mean() for c in classes])
+        sorted_values, factors = [], []
+        for c in classes:
+            Xc = X[y == c]
+            sorted_values.append(np.sort(Xc, axis=0))
+            scores = np.column_stack([_normal_scores(Xc[:, j]) for j in range(Xc.shape[1])])
+            factors.append(_cholesky(np.corrcoef(scores, rowvar=False)))
+        dtypes = {col: df[col].dtype for col in FEATURE_NAMES if col not in CATEGORY_MAPS}
+        return cls(classes, priors, sorted_values, factors, dtypes)
+
+    # Sampling n baris (kode encoder) untuk satu kelas
+    def _sample_class(self, i, n, rng):
+        z = rng.standard_normal((n, len(FEATURE_NAMES))) @ self.factors[i].T
+        values = self.sorted_values[i]
+        # Inverse CDF empiris: kuantil u diambil langsung dari nilai data.csv yang sudah diurutkan
+        positions = np.minimum((_normal_cdf(z) * len(values)).astype(np.int64), len(values) - 1)
+        return np.take_along_axis(values, positions, axis=0)
+
+    # Fungsi untuk membuat n baris sintetis dalam skema data.csv
+    def sample(self, n, rng):
+        counts = rng.multinomial(n, self.priors)
+        X = np.vstack([self._sample_class(i, count, rng) for i, count in enumerate(counts)])
+        y = np.repeat(self.classes, counts)
+        order = rng.permutation(n)
+        X, y = X[order], y[order]
+
+        data = {}
+        for j, col in enumerate(FEATURE_NAMES):
+            if col in CATEGORY_MAPS:
+                labels, positions = self.categories[col]
+                data[col] = pd.Categorical.from_codes(positions[X[:, j].astype(np.int64)], categories=labels)
+            else:
+                data[col] = X[:, j].astype(self.dtypes[col])
+        data[TARGET] = y
+        return pd.DataFrame(data, columns=COLUMNS)
+
+
+# Generator chunk DataFrame sampai total rows baris
+def generate(model, rows, chunksize=CHUNK_SIZE, seed=DEFAULT_SEED):
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunksize):
+        yield model.sample(min(chunksize, rows - start), rng)
+
+
+def write_csv(chunks, path):
+    total = 0
+    with open(path, 'w', newline='') as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=(i == 0), index=False)
+            total += len(chunk)
+            yield total
+
+
+def write_parquet(chunks, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit('Output Parquet membutuhkan pyarrow (pip install pyarrow)')
+
+    writer = None
+    total = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            # Setiap chunk menjadi satu row group
+            writer.write_table(table)
+            total += len(chunk)
+            yield total
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+# Bulk load ke tabel database: COPY untuk PostgreSQL, executemany untuk database lain (misalnya SQLite)
+def write_sql(chunks, engine, table, replace=True):
+    from data_access import create_table
+
+    total = 0
+    columns = ', '.join(f'"{col}"' for col in COLUMNS)
+    for i, chunk in enumerate(chunks):
+        if i == 0:
+            with engine.begin() as conn:
+                create_table(conn, chunk, table, replace=replace)
+
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            if engine.dialect.name == 'postgresql':
+                buffer = io.StringIO()
+                chunk.to_csv(buffer, header=False, index=False)
+                buffer.seek(0)
+                cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+            else:
+                marker = '?' if engine.dialect.paramstyle == 'qmark' else '%s'
+                placeholders = ', '.join([marker] * len(COLUMNS))
+                rows = chunk.astype(object).itertuples(index=False, name=None)
+                cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', rows)
+            raw.commit()
+        finally:
+            raw.close()
+        total += len(chunk)
+        yield total
+
+
+# Jumlah baris yang sudah ada di tabel (0 jika tabel belum ada)
+def existing_rows(engine, table):
+    from sqlalchemy import inspect, text
+
+    if not inspect(engine).has_table(table):
+        return 0
+    with engine.connect() as conn:
+        return int(conn.execute(text(f'SELECT COUNT(*) FROM {table}')).scalar())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Membuat data sintetis dengan skema data.csv untuk load test')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--out', help='File output .csv atau .parquet')
+    parser.add_argument('--db-url', help='URL database tujuan, contoh: sqlite:///synthetic.db')
+    parser.add_argument('--table', default='spktable')
+    parser.add_argument('--append', action='store_true', help='Tambahkan ke tabel yang sudah ada (default: tabel dibuat ulang)')
+    parser.add_argument('--source', default=CSV_PATH, help='Data untuk fitting distribusi')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--seed', type=int,
+                        help=f'Seed random (default {DEFAULT_SEED}; dengan --append diturunkan dari jumlah baris yang sudah ada)')
+    args = parser.parse_args()
+
+    if bool(args.out) == bool(args.db_url):
+        parser.error('Pilih salah satu: --out atau --db-url')
+
+    if args.append and not args.db_url:
+        parser.error('--append hanya bisa dipakai bersama --db-url')
+
+    engine = None
+    seed = DEFAULT_SEED if args.seed is None else args.seed
+    if args.db_url:
+        from sqlalchemy import create_engine
+        engine = create_engine(args.db_url)
+        # Tanpa seed eksplisit, --append dengan seed default akan memasukkan baris yang persis sama lagi
+        if args.append and args.seed is None:
+            seed = DEFAULT_SEED + existing_rows(engine, args.table)
+            print(f'Seed {seed} (diturunkan dari jumlah baris di {args.table})', file=sys.stderr)
+
+    model = SyntheticModel.fit(pd.read_csv(args.source))
+    chunks = generate(model, args.rows, args.chunksize, seed)
+    if engine is not None:
+        progress = write_sql(chunks, engine, args.table, replace=not args.append)
+        target = f'{args.table} ({args.db_url})'
+    elif args.out.endswith('.parquet'):
+        progress = write_parquet(chunks, args.out)
+        target = args.out
+    else:
+        progress = write_csv(chunks, args.out)
+        target = args.out
+
+    start = time.perf_counter()
+    total = 0
+    for total in progress:
+        elapsed = time.perf_counter() - start
+        print(f'\r{total:,} / {args.rows:,} baris ({total / elapsed:,.0f} baris/detik)', end='', file=sys.stderr)
+    print(file=sys.stderr)
+    print(f'{total:,} baris sintetis tersimpan di {target}')
+
+
+if __name__ == '__main__':
+    main()
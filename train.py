@@ -0,0 +1,324 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.naive_bayes import GaussianNB
+
+from encoder import FEATURE_NAMES, TARGET, attach_schema, encode_frame
+
+# Pipeline training pengganti grid search di Notebook_Prediction.ipynb.
+# - Setiap kombinasi (model, parameter, fold) dijalankan paralel dengan process pool
+# - Successive halving: semua kombinasi dievaluasi dengan sedikit fold dulu, hanya yang terbaik
+#   yang dilanjutkan ke fold berikutnya
+# - Early stopping memakai sebagian data train setiap fold sebagai eval set (fold validasi hanya untuk skor),
+#   model akhir di-train ulang dengan median jumlah iterasi hasil early stopping dari semua fold
+# - Hasil setiap fold di-cache di disk, sehingga run berikutnya hanya men-train kombinasi yang berubah
+# - Output: model .cbm (dengan skema encoder di metadata) dan model_metrics.json untuk halaman Model Information
+#
+# Contoh: python train.py --jobs 8
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, 'data.csv')
+MODEL_PATH = os.path.join(BASE_DIR, 'catboost_model_heart_disease.cbm')
+METRICS_PATH = os.path.join(BASE_DIR, 'model_metrics.json')
+CACHE_DIR = os.path.join(BASE_DIR, '.train_cache')
+
+RANDOM_STATE = 92
+N_SPLITS = 5
+# Porsi data train setiap fold yang dipakai sebagai eval set early stopping
+EARLY_STOPPING_FRACTION = 0.1
+# Dinaikkan jika isi hasil fold di cache berubah, supaya hasil lama tidak dipakai
+CACHE_VERSION = 2
+
+# Grid parameter sama seperti di notebook
+PARAM_GRIDS = {
+    'Gradient Boosting': {
+        'n_estimators': [100, 200, 300],
+        'learning_rate': [0.1, 0.01, 0.001],
+        'max_depth': [3, 5, 7],
+    },
+    'CatBoost': {
+        'iterations': [100, 200, 300],
+        'learning_rate': [0.1, 0.01, 0.001],
+        'depth': [4, 6, 8],
+    },
+    'XGBoost': {
+        'n_estimators': [100, 200, 300],
+        'learning_rate': [0.1, 0.01, 0.001],
+        'max_depth': [3, 5, 7],
+    },
+}
+
+# Parameter jumlah iterasi setiap model, diisi dengan hasil early stopping saat train ulang model akhir
+ITERATION_PARAMS = {'Gradient Boosting': 'n_estimators', 'CatBoost': 'iterations', 'XGBoost': 'n_estimators'}
+
+# Urutan model pada halaman Model Information
+MODEL_ORDER = ['Logistic Regression', 'Gradient Boosting', 'CatBoost', 'Naive Bayes', 'XGBoost']
+
+
+def xgboost_available():
+    try:
+        import xgboost  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Fungsi untuk membuat model sesuai nama dan parameter
+# Setiap proses worker hanya memakai satu thread supaya tidak saling berebut core
+def make_model(name, params, early_stopping_rounds=0, threads=1):
+    if name == 'Logistic Regression':
+        return LogisticRegression()
+    if name == 'Naive Bayes':
+        return GaussianNB()
+    if name == 'Gradient Boosting':
+        extra = {'n_iter_no_change': early_stopping_rounds, 'validation_fraction': 0.1} if early_stopping_rounds else {}
+        return GradientBoostingClassifier(**params, random_state=RANDOM_STATE, **extra)
+    if name == 'CatBoost':
+        from catboost import CatBoostClassifier
+        extra = {'early_stopping_rounds': early_stopping_rounds} if early_stopping_rounds else {}
+        return CatBoostClassifier(**params, random_state=RANDOM_STATE, verbose=False, thread_count=threads,
+                                  allow_writing_files=False, **extra)
+    if name == 'XGBoost':
+        from xgboost import XGBClassifier
+        extra = {'early_stopping_rounds': early_stopping_rounds} if early_stopping_rounds else {}
+        return XGBClassifier(**params, random_state=RANDOM_STATE, n_jobs=threads, **extra)
+    raise ValueError(f'Model tidak dikenal: {name}')
+
+
+def _fit(model, name, X_train, y_train, X_val=None, y_val=None):
+    if X_val is not None and name == 'CatBoost' and model.get_params().get('early_stopping_rounds'):
+        model.fit(X_train, y_train, eval_set=(X_val, y_val))
+    elif X_val is not None and name == 'XGBoost' and model.get_params().get('early_stopping_rounds'):
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+    else:
+        model.fit(X_train, y_train)
+    return model
+
+
+# Jumlah iterasi yang benar-benar dipakai model setelah early stopping (None untuk model tanpa iterasi)
+def fitted_iterations(model, name):
+    if name == 'CatBoost':
+        best = model.get_best_iteration()
+        return int(best) + 1 if best is not None else int(model.tree_count_)
+    if name == 'XGBoost':
+        best = getattr(model, 'best_iteration', None)
+        return int(best) + 1 if best is not None else int(model.get_params()['n_estimators'])
+    if name == 'Gradient Boosting':
+        return int(model.n_estimators_)
+    return None
+
+
+# Data train dikirim sekali ke setiap proses worker, bukan bersama setiap task
+_worker_data = {}
+
+
+def init_worker(X, y):
+    _worker_data['X'] = X
+    _worker_data['y'] = y
+
+
+# Fungsi yang dijalankan di proses worker: train satu kombinasi parameter pada satu fold
+def run_fold(task):
+    name, params, train_idx, val_idx, early_stopping_rounds = task
+    X, y = _worker_data['X'], _worker_data['y']
+    start = time.perf_counter()
+    model = make_model(name, params, early_stopping_rounds)
+    if early_stopping_rounds and name in ('CatBoost', 'XGBoost'):
+        # Eval set early stopping diambil dari data train fold, sehingga skor pada fold validasi tidak bias
+        fit_idx, stop_idx = train_test_split(train_idx, test_size=EARLY_STOPPING_FRACTION,
+                                             stratify=y[train_idx], random_state=RANDOM_STATE)
+        _fit(model, name, X[fit_idx], y[fit_idx], X[stop_idx], y[stop_idx])
+    else:
+        _fit(model, name, X[train_idx], y[train_idx])
+    accuracy = accuracy_score(y[val_idx], model.predict(X[val_idx]))
+    return {'accuracy': float(accuracy), 'iterations': fitted_iterations(model, name),
+            'seconds': time.perf_counter() - start}
+
+
+def _task_key(name, params, fold, data_version, early_stopping_rounds):
+    payload = json.dumps([name, params, fold, N_SPLITS, data_version, early_stopping_rounds, RANDOM_STATE, CACHE_VERSION],
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+
+class FoldCache:
+    def __init__(self, path=CACHE_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def get(self, key):
+        try:
+            with open(os.path.join(self.path, f'{key}.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, result):
+        tmp_path = os.path.join(self.path, f'{key}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp_path, os.path.join(self.path, f'{key}.json'))
+
+
+# Successive halving untuk semua model sekaligus: fold adalah "budget" yang ditambah setiap rung
+def search(X, y, models, executor, cache, data_version, eta=3, min_folds=1, early_stopping_rounds=20, log=print):
+    folds = list(StratifiedKFold(n_splits=N_SPLITS).split(X, y))
+    candidates = {name: [dict(zip(PARAM_GRIDS[name], values)) for values in product(*PARAM_GRIDS[name].values())]
+                  for name in models}
+    scores = {}
+
+    budget = N_SPLITS if eta <= 1 else min_folds
+    while True:
+        tasks, keys = [], []
+        for name, configs in candidates.items():
+            for params in configs:
+                for fold in range(budget):
+                    key = _task_key(name, params, fold, data_version, early_stopping_rounds)
+                    if (name, key) in scores:
+                        continue
+                    result = cache.get(key)
+                    if result is not None:
+                        scores[(name, key)] = result
+                        continue
+                    train_idx, val_idx = folds[fold]
+                    tasks.append((name, params, train_idx, val_idx, early_stopping_rounds))
+                    keys.append((name, key))
+
+        n_configs = sum(len(configs) for configs in candidates.values())
+        log(f'Rung {budget} fold: {n_configs} kombinasi, {len(tasks)} fold perlu di-train ({len(scores)} dari cache/rung sebelumnya)')
+        for (name, key), result in zip(keys, executor.map(run_fold, tasks)):
+            cache.put(key, result)
+            scores[(name, key)] = result
+
+        def fold_results(name, params):
+            return [scores[(name, _task_key(name, params, fold, data_version, early_stopping_rounds))]
+                    for fold in range(budget)]
+
+        def mean_score(name, params):
+            return np.mean([result['accuracy'] for result in fold_results(name, params)])
+
+        # Median jumlah iterasi hasil early stopping dari semua fold (None untuk model tanpa iterasi)
+        def median_iterations(name, params):
+            iterations = [result['iterations'] for result in fold_results(name, params)]
+            return int(np.median(iterations)) if None not in iterations else None
+
+        ranked = {name: sorted(configs, key=lambda params: -mean_score(name, params))
+                  for name, configs in candidates.items()}
+        if budget >= N_SPLITS:
+            return {name: {'params': configs[0], 'cv_accuracy': float(mean_score(name, configs[0])),
+                           'iterations': median_iterations(name, configs[0])}
+                    for name, configs in ranked.items()}
+
+        # Hanya 1/eta kombinasi terbaik yang lanjut ke rung berikutnya
+        candidates = {name: configs[:max(1, len(configs) // eta)] for name, configs in ranked.items()}
+        budget = min(N_SPLITS, budget * eta)
+
+
+# Fungsi untuk mengambil data training: data.csv, atau snapshot kolom hanya jika diminta (--source snapshot)
+# supaya training tidak diam-diam memakai snapshot yang sudah lama atau berisi data sintetis
+def load_training_data(source='csv', csv_path=CSV_PATH):
+    if source == 'snapshot':
+        from snapshot import open_snapshot
+        snapshot = open_snapshot()
+        if snapshot is None:
+            raise FileNotFoundError('Snapshot belum dibuat, jalankan python snapshot.py terlebih dahulu')
+        X, y = snapshot.features()
+        return pd.DataFrame(X, columns=FEATURE_NAMES), pd.Series(y.astype(np.int64), name=TARGET), f'snapshot:{snapshot.version}'
+    df = pd.read_csv(csv_path)
+    X = pd.DataFrame(encode_frame(df), columns=FEATURE_NAMES)
+    return X, df[TARGET].astype(np.int64), f'csv:{os.path.basename(csv_path)}'
+
+
+def _data_hash(X, y):
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    h.update(np.ascontiguousarray(y.to_numpy(dtype=np.int64)).tobytes())
+    return h.hexdigest()[:16]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Training model prediksi penyakit jantung')
+    parser.add_argument('--source', choices=['csv', 'snapshot'], default='csv')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Jumlah proses worker')
+    parser.add_argument('--eta', type=int, default=3, help='Faktor pruning successive halving (1 = tanpa pruning, sama dengan GridSearchCV)')
+    parser.add_argument('--min-folds', type=int, default=1, help='Jumlah fold pada rung pertama')
+    parser.add_argument('--early-stopping-rounds', type=int, default=20, help='0 untuk mematikan early stopping')
+    parser.add_argument('--models', nargs='+', default=[name for name in MODEL_ORDER if name in PARAM_GRIDS],
+                        help='Model yang dicari parameternya (default: semua)')
+    parser.add_argument('--model-out', default=MODEL_PATH)
+    parser.add_argument('--metrics-out', default=METRICS_PATH)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    # Sama seperti di notebook, Logistic Regression dipakai dengan parameter default
+    warnings.filterwarnings('ignore', category=ConvergenceWarning)
+
+    start = time.perf_counter()
+    X, y, source = load_training_data(args.source, args.csv)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+    data_version = _data_hash(X_train, y_train)
+
+    models = [name for name in args.models if name != 'XGBoost' or xgboost_available()]
+    if len(models) != len(args.models):
+        print('xgboost tidak terpasang, XGBoost dilewati')
+    if 'CatBoost' not in models:
+        parser.error('CatBoost harus termasuk dalam --models karena model .cbm berasal dari CatBoost')
+
+    X_values, y_values = X_train.to_numpy(), y_train.to_numpy()
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=init_worker, initargs=(X_values, y_values)) as executor:
+        best = search(X_values, y_values, models, executor, FoldCache(args.cache_dir),
+                      data_version, eta=args.eta, min_folds=args.min_folds,
+                      early_stopping_rounds=args.early_stopping_rounds)
+
+    # Train ulang model terbaik pada seluruh data train, lalu evaluasi pada data test (seperti pred_model di notebook)
+    results = []
+    for name in MODEL_ORDER:
+        if name in PARAM_GRIDS and name not in best:
+            continue
+        params = dict(best[name]['params']) if name in best else {}
+        # Model akhir memakai jumlah iterasi yang sama dengan model yang diskor saat cross validation
+        if name in best and best[name]['iterations'] is not None:
+            params[ITERATION_PARAMS[name]] = best[name]['iterations']
+        model = make_model(name, params, threads=args.jobs)
+        model.fit(X_train, y_train)
+        results.append({
+            'name': name,
+            'params': params,
+            'cv_accuracy': best[name]['cv_accuracy'] if name in best else None,
+            'train_accuracy': float(accuracy_score(y_train, model.predict(X_train))),
+            'test_accuracy': float(accuracy_score(y_test, model.predict(X_test))),
+        })
+        if name == 'CatBoost':
+            attach_schema(model)
+            model.save_model(args.model_out)
+        print(f"{name}: train={results[-1]['train_accuracy']:.4f} test={results[-1]['test_accuracy']:.4f} {params}")
+
+    metrics = {
+        'source': source,
+        'data_version': data_version,
+        'random_state': RANDOM_STATE,
+        'selected_model': 'CatBoost',
+        'model_file': os.path.basename(args.model_out),
+        'models': results,
+    }
+    with open(args.metrics_out, 'w') as f:
+        json.dump(metrics, f, indent=2)
+    print(f'Selesai dalam {time.perf_counter() - start:.1f} detik, metrics tersimpan di {args.metrics_out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Engine inference untuk model CatBoost yang di-compile menjadi array NumPy datar.
+# CatBoost memakai oblivious tree: setiap level pada satu pohon memakai split yang sama,
+# sehingga index leaf cukup dihitung dari bit hasil perbandingan (fitur > border) per level.
+# Seluruh pohon dievaluasi sekaligus untuk satu batch tanpa loop Python per baris.
+
+# Jumlah baris yang dievaluasi sekaligus, supaya array sementara (baris x pohon) tetap kecil
+CHUNK_SIZE = 2048
+
+
+class CompiledEnsemble:
+    def __init__(self, split_features, thresholds, leaf_values, scale, bias, feature_names):
+        # split_features/thresholds: (jumlah pohon, depth), leaf_values: (jumlah pohon, 2^depth)
+        self.split_features = np.ascontiguousarray(split_features, dtype=np.int32)
+        self.thresholds = np.ascontiguousarray(thresholds, dtype=np.float32)
+        # Leaf float32 (misalnya dari serving_artifact.py) dipakai apa adanya, dijumlahkan dalam float64
+        leaf_dtype = np.float32 if np.asarray(leaf_values).dtype in (np.float16, np.float32) else np.float64
+        self.leaf_values = np.ascontiguousarray(leaf_values, dtype=leaf_dtype)
+        self.scale = float(scale)
+        self.bias = float(bias)
+        self.feature_names = list(feature_names)
+        self.tree_count, self.depth = self.split_features.shape
+        if self.depth > 16:
+            raise ValueError('Depth pohon maksimal 16')
+
+        # Banyak pohon memakai pasangan (fitur, border) yang sama, jadi perbandingannya cukup dihitung sekali.
+        # split_ids menunjuk ke baris pada tabel split unik untuk setiap (pohon, level).
+        pairs = np.stack([self.split_features.ravel().astype(np.float64), self.thresholds.ravel().astype(np.float64)], axis=1)
+        unique_pairs, split_ids = np.unique(pairs, axis=0, return_inverse=True)
+        self._unique_features = unique_pairs[:, 0].astype(np.intp)
+        self._unique_borders = unique_pairs[:, 1].astype(np.float32)[:, None]
+        self._split_ids = split_ids.reshape(self.tree_count, self.depth)
+
+        # Offset setiap pohon pada leaf_values yang di-flatten
+        self._leaf_offsets = (np.arange(self.tree_count, dtype=np.intp) << self.depth)[:, None]
+        self._leaf_flat = self.leaf_values.ravel()
+
+    # Menghitung index leaf untuk setiap (pohon, baris); X_t berbentuk (fitur, baris)
+    def _leaf_index(self, X_t):
+        bits = (X_t[self._unique_features] > self._unique_borders).view(np.uint8)
+        index_dtype = np.uint8 if self.depth <= 8 else np.uint16
+        if index_dtype is np.uint16:
+            bits = bits.astype(np.uint16)
+        index = np.zeros((self.tree_count, X_t.shape[1]), dtype=index_dtype)
+        level_bits = np.empty_like(index)
+        for level in range(self.depth):
+            np.take(bits, self._split_ids[:, level], axis=0, out=level_bits, mode='clip')
+            # Perkalian dengan 2^level lebih cepat daripada left_shift untuk integer kecil di NumPy
+            np.multiply(level_bits, index_dtype(1 << level), out=level_bits)
+            index |= level_bits
+        return index
+
+    # Nilai mentah (log-odds), sama dengan prediction_type='RawFormulaVal' di CatBoost
+    def raw_predict(self, X, chunk_size=CHUNK_SIZE):
+        # CatBoost membandingkan fitur dalam float32
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        raw = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            X_t = np.ascontiguousarray(X[start:start + chunk_size].T)
+            index = self._leaf_offsets + self._leaf_index(X_t)
+            raw[start:start + chunk_size] = np.take(self._leaf_flat, index).sum(axis=0, dtype=np.float64)
+        return raw * self.scale + self.bias
+
+    def predict_proba(self, X):
+        p = 1.0 / (1.0 + np.exp(-self.raw_predict(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return (self.raw_predict(X) > 0).astype(np.int64)
+
+
+# Fungsi untuk meng-compile hasil export JSON CatBoost menjadi CompiledEnsemble
+def compile_json(model_json):
+    float_features = model_json['features_info']['float_features']
+    feature_names = [f.get('feature_id') or str(f['flat_feature_index']) for f in float_features]
+    flat_index = {f['feature_index']: f['flat_feature_index'] for f in float_features}
+    trees = model_json['oblivious_trees']
+    depth = max(len(tree['splits']) for tree in trees)
+
+    split_features = np.zeros((len(trees), depth), dtype=np.int32)
+    # Level yang tidak dipakai diisi border +inf sehingga bit-nya selalu 0
+    thresholds = np.full((len(trees), depth), np.inf, dtype=np.float32)
+    leaf_values = np.zeros((len(trees), 1 << depth), dtype=np.float64)
+    for t, tree in enumerate(trees):
+        for level, split in enumerate(tree['splits']):
+            if split['split_type'] != 'FloatFeature':
+                raise ValueError(f"Split {split['split_type']} belum didukung, hanya fitur numerik")
+            split_features[t, level] = flat_index[split['float_feature_index']]
+            thresholds[t, level] = split['border']
+        values = tree['leaf_values']
+        if len(values) != 1 << len(tree['splits']):
+            raise ValueError('Hanya model klasifikasi biner (satu nilai per leaf) yang didukung')
+        leaf_values[t, :len(values)] = values
+
+    scale, bias = model_json.get('scale_and_bias', [1, [0]])
+    bias = bias[0] if isinstance(bias, list) else bias
+    return CompiledEnsemble(split_features, thresholds, leaf_values, scale, bias, feature_names)
+
+
+# Fungsi untuk meng-compile model CatBoost (objek model atau path .cbm) lewat export JSON
+def compile_model(model_or_path):
+    model = model_or_path
+    if isinstance(model_or_path, str):
+        from catboost import CatBoostClassifier
+        model = CatBoostClassifier()
+        model.load_model(model_or_path)
+
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        model.save_model(path, format='json')
+        with open(path) as f:
+            return compile_json(json.load(f))
+    finally:
+        os.remove(path)
@@ -0,0 +1,114 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from encoder import FEATURE_NAMES, FORM_RANGES
+from figure_cache import FigureCache
+from metrics import register_gauge, timer
+from model_registry import get_model_entry
+from prediction_cache import prediction_cache
+
+# Mode what-if pada halaman prediksi.
+# Untuk satu profil yang sudah disubmit, probabilitas dihitung untuk setiap nilai yang mungkin
+# pada setiap slider numerik (feature lain tetap), semuanya dalam satu panggilan predict_proba.
+# Hasilnya (risk surface) di-cache, sehingga menggeser slider what-if hanya membaca dari surface.
+
+WHAT_IF_LABELS = {
+    'Age': 'Umur',
+    'RestingBP': 'Tekanan darah (mmHg)',
+    'Cholesterol': 'Kolesterol (mg/dl)',
+    'MaxHR': 'Denyut jantung maksimal',
+    'Oldpeak': 'Depresi segmen ST (Oldpeak)',
+}
+
+DEFAULT_MAX_SURFACES = int(os.environ.get('HEART_WHAT_IF_CACHE_SIZE', 1024))
+DEFAULT_FIGURE_BYTES = int(float(os.environ.get('HEART_WHAT_IF_FIGURE_CACHE_MB', 8)) * 1024 * 1024)
+
+
+# Fungsi untuk membuat seluruh baris yang perlu diprediksi: satu blok per slider numerik
+def surface_grid(profile):
+    profile = np.asarray(profile, dtype=np.float64)
+    blocks = []
+    for col, values in FORM_RANGES.items():
+        block = np.repeat(profile[None, :], len(values), axis=0)
+        block[:, FEATURE_NAMES.index(col)] = list(values)
+        blocks.append(block)
+    return np.vstack(blocks)
+
+
+# Fungsi untuk menghitung risk surface: {feature: (nilai slider, probabilitas)}
+def compute_surface(entry, profile):
+    proba = prediction_cache.predict_proba(entry, surface_grid(profile))
+    surface = {}
+    start = 0
+    for col, values in FORM_RANGES.items():
+        surface[col] = (list(values), proba[start:start + len(values)])
+        start += len(values)
+    return surface
+
+
+class RiskSurfaceCache:
+    def __init__(self, max_entries=DEFAULT_MAX_SURFACES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Key = versi model + profil (hasil encoder), jadi surface lama tidak dipakai setelah model berubah
+    def get(self, profile):
+        entry = get_model_entry()
+        key = (entry.version, tuple(float(v) for v in profile))
+        with self._lock:
+            surface = self._items.get(key)
+            if surface is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return surface, entry.version
+
+        with timer('what_if_surface'):
+            surface = compute_surface(entry, profile)
+        with self._lock:
+            self.misses += 1
+            self._items[key] = surface
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return surface, entry.version
+
+    def stats(self):
+        return {'entries': len(self._items), 'hits': self.hits, 'misses': self.misses}
+
+
+# Cache yang di-share oleh seluruh session dalam satu proses
+risk_surfaces = RiskSurfaceCache()
+register_gauge('what_if_cache', risk_surfaces.stats)
+
+# Grafik sensitivitas berbeda untuk setiap profil, sehingga disimpan di cache kecil tersendiri
+# (hanya di memori) supaya tidak menggeser grafik Insights/Model Information dari figure_cache
+sensitivity_figures = FigureCache(max_bytes=DEFAULT_FIGURE_BYTES, disk_dir=None)
+register_gauge('what_if_figure_cache', sensitivity_figures.stats)
+
+
+# Fungsi untuk mengambil probabilitas dari surface tanpa memanggil model
+def lookup(surface, col, value):
+    values, proba = surface[col]
+    return float(proba[values.index(value)])
+
+
+# Fungsi untuk menggambar kurva sensitivitas satu feature, nilai input user ditandai dengan titik
+def draw_sensitivity(surface, col, current):
+    values, proba = surface[col]
+    fig = Figure(figsize=(9, 4))
+    ax = fig.subplots()
+    ax.plot(values, proba * 100, color='#f22c2c')
+    ax.axhline(50, color='gray', linestyle='--', linewidth=1)
+    ax.scatter([current], [lookup(surface, col, current) * 100], color='black', zorder=3, label='Input Anda')
+    ax.set_ylim(0, 100)
+    ax.set_xlabel(WHAT_IF_LABELS[col])
+    ax.set_ylabel('Probabilitas penyakit jantung (%)')
+    ax.set_title(f'Perubahan risiko berdasarkan {WHAT_IF_LABELS[col]}')
+    ax.legend(loc='upper right')
+    return fig
@@ -1,6 +1,10 @@
 import streamlit as st
 import numpy as np
-from catboost import CatBoostClassifier
+from encoder import FEATURE_NAMES, FORM_LABELS, FORM_RANGES, encode_form
+from explain import contribution_table, explain
+from metrics import start_file_exporter, timer, track_session
+from model_registry import get_model_entry
+from what_if import WHAT_IF_LABELS, draw_sensitivity, lookup, risk_surfaces, sensitivity_figures
 
 # Konfigurasi judul dan icon page
 st.set_page_config(
@@ -8,13 +12,10 @@ st.set_page_config(
     page_icon="💓"
 )
 
-# Fungsi untuk load model catboost
-def load_model():
-    model = CatBoostClassifier()
-    model.load_model('catboost_model_heart_disease.cbm')
-    return model
+track_session()
 
-model = load_model()
+# Model di-load sekali per proses lewat model_registry dan di-reload otomatis jika file .cbm berubah.
+# Hasil prediksi dan penjelasannya di-cache per vektor input + versi model dan di-share ke semua session.
 
 # Menampilkan halaman prediksi
 def show_predict():
@@ -24,76 +25,51 @@ def show_predict():
         st.info('📢 Untuk keperluan demo, nilai data input akan digenerate secara random jika tidak diisi. Tujuannya supaya memudahkan jika ingin mencoba-coba sistem prediksi ini.')
 
         rand_age = np.random.randint(27, 77)
-        age = st.select_slider('Berapa umur Anda?', options=[i for i in range(1, 126)], value=rand_age, help='Bertambahnya umur meningkatkan risiko penyakit jantung.')
+        age = st.select_slider('Berapa umur Anda?', options=list(FORM_RANGES['Age']), value=rand_age, help='Bertambahnya umur meningkatkan risiko penyakit jantung.')
 
         rand_sex = np.random.randint(0, 2)
-        sex = st.selectbox('Apa jenis kelamin Anda?', ("Laki-laki", "Perempuan"), index=rand_sex, help='Laki-laki lebih rawan menderita penyakit jantung.')
-        if sex == 'Laki-laki':
-            sex = 1
-        elif sex == 'Perempuan':
-            sex = 2
+        sex = st.selectbox('Apa jenis kelamin Anda?', list(FORM_LABELS['Sex']), index=rand_sex, help='Laki-laki lebih rawan menderita penyakit jantung.')
 
         rand_chestpain = np.random.randint(0, 4)
-        chestpain = st.selectbox('Apa jenis nyeri dada yang Anda rasakan?', ("Asymptomatic", "Non-anginal Pain", "Atypical Angina", "Typical Angina"), index=rand_chestpain, help='Diskusikan gejala nyeri dada yang Anda rasakan dengan dokter.')
-        if chestpain == 'Asymptomatic':
-            chestpain = 1
-        elif chestpain == 'Non-anginal Pain':
-            chestpain = 2
-        elif chestpain == 'Atypical Angina':
-            chestpain = 3
-        elif chestpain == 'Typical Angina':
-            chestpain = 4
-        
+        chestpain = st.selectbox('Apa jenis nyeri dada yang Anda rasakan?', list(FORM_LABELS['ChestPainType']), index=rand_chestpain, help='Diskusikan gejala nyeri dada yang Anda rasakan dengan dokter.')
+
         rand_restingbp = np.random.randint(90, 180)
-        restingbp = st.select_slider('Berapa tekanan darah Anda dalam satuan mmHg?', options=[i for i in range(90, 181)], value=rand_restingbp, help='Tekanan darah yang tinggi menyebabkan jantung bekerja keras memompa darah ke seluruh tubuh.')
+        restingbp = st.select_slider('Berapa tekanan darah Anda dalam satuan mmHg?', options=list(FORM_RANGES['RestingBP']), value=rand_restingbp, help='Tekanan darah yang tinggi menyebabkan jantung bekerja keras memompa darah ke seluruh tubuh.')
 
         rand_cholesterol = np.random.randint(145, 360)
-        cholesterol = st.select_slider('Berapa total kolestrol Anda dalam satuan mg/dl?', options=[i for i in range(145, 361)], value=rand_cholesterol, help='Kolesterol tinggi menyebabkan penumpukan lemak di dinding arteri')
+        cholesterol = st.select_slider('Berapa total kolestrol Anda dalam satuan mg/dl?', options=list(FORM_RANGES['Cholesterol']), value=rand_cholesterol, help='Kolesterol tinggi menyebabkan penumpukan lemak di dinding arteri')
 
         rand_fastingbs = np.random.randint(0, 2)
-        fastingbs = st.selectbox('Berapa kadar gula darah Anda?', ("Di bawah 120mg/dL", "Di atas 120mg/dL"), index=rand_fastingbs, help='Kadar gula darah yang tinggi menyebabkan rusaknya pembuluh darah dan jantung.')
-        if fastingbs == 'Di bawah 120mg/dL':
-            fastingbs = 0
-        elif fastingbs == 'Di atas 120mg/dL':
-            fastingbs = 1
+        fastingbs = st.selectbox('Berapa kadar gula darah Anda?', list(FORM_LABELS['FastingBS']), index=rand_fastingbs, help='Kadar gula darah yang tinggi menyebabkan rusaknya pembuluh darah dan jantung.')
 
         rand_restingecg = np.random.randint(0, 3)
-        restingecg = st.selectbox('Apa hasil tes resting electrocardiogram Anda?', ("Normal", "Penebalan Dinding Ventrikel Kiri", "Segmen ST Abnormal"), index=rand_restingecg, help='Lakukan tes electrocardiogram di laboratorium untuk mendapatkan hasilnya')
-        if restingecg == 'Normal':
-            restingecg = 0
-        elif restingecg == 'Penebalan Dinding Ventrikel Kiri':
-            restingecg = 1
-        elif restingecg == 'Segmen ST Abnormal':
-            restingecg = 2
+        restingecg = st.selectbox('Apa hasil tes resting electrocardiogram Anda?', list(FORM_LABELS['RestingECG']), index=rand_restingecg, help='Lakukan tes electrocardiogram di laboratorium untuk mendapatkan hasilnya')
 
         rand_maxhr = np.random.randint(60, 201)
-        maxhr = st.select_slider('Berapa denyut jantung maksimal Anda dalam satu menit', options=[i for i in range(60, 201)], value=rand_maxhr, help='Jantung yang bermasalah memiliki denyut jantung yang cenderung lambat.')
+        maxhr = st.select_slider('Berapa denyut jantung maksimal Anda dalam satu menit', options=list(FORM_RANGES['MaxHR']), value=rand_maxhr, help='Jantung yang bermasalah memiliki denyut jantung yang cenderung lambat.')
 
         rand_exerciseangina = np.random.randint(0, 2)
-        exerciseangina = st.selectbox('Apakah Anda merasakan nyeri dada saat berolahraga?', ("Iya", "Tidak"), index=rand_exerciseangina, help='Nyeri dada setelah berolahraga menunjukkan bahwa pasokan darah ke otot jantung tidak cukup atau terganggu.')
-        if exerciseangina == 'Iya':
-            exerciseangina = 1
-        elif exerciseangina == 'Tidak':
-            exerciseangina = 0
+        exerciseangina = st.selectbox('Apakah Anda merasakan nyeri dada saat berolahraga?', list(FORM_LABELS['ExerciseAngina']), index=rand_exerciseangina, help='Nyeri dada setelah berolahraga menunjukkan bahwa pasokan darah ke otot jantung tidak cukup atau terganggu.')
 
         rand_oldpeak = np.random.randint(0, 7)
-        oldpeak = st.select_slider('Berapa tingkat depresi segmen ST Anda?', options=[i for i in range(0, 7)], value=rand_oldpeak, help="Silakan lakukan tes di laboratorium menggunakan alat EKG (Elektrokardiogram) untuk mengetahui tingkat depresi segmen ST Anda.")
+        oldpeak = st.select_slider('Berapa tingkat depresi segmen ST Anda?', options=list(FORM_RANGES['Oldpeak']), value=rand_oldpeak, help="Silakan lakukan tes di laboratorium menggunakan alat EKG (Elektrokardiogram) untuk mengetahui tingkat depresi segmen ST Anda.")
 
         rand_st_slope = np.random.randint(0, 3)
-        st_slope = st.selectbox('Bagaimana kemiringan segmen ST Anda?', ("Upsloping", "Flat", "Downsloping"), index=rand_st_slope, help='Ukur kemiringan segmen ST menggunakan alat EKG (Elektrokardiogram) yang biasa dimiliki laboratorium.')
-        if st_slope == 'Upsloping':
-            st_slope = 1
-        elif st_slope == 'Flat':
-            st_slope = 2
-        elif st_slope == 'Downsloping':
-            st_slope = 3
+        st_slope = st.selectbox('Bagaimana kemiringan segmen ST Anda?', list(FORM_LABELS['ST_Slope']), index=rand_st_slope, help='Ukur kemiringan segmen ST menggunakan alat EKG (Elektrokardiogram) yang biasa dimiliki laboratorium.')
 
         ok = st.form_submit_button("Predict")
         if ok:
-            X = np.array([[age, sex, chestpain, restingbp, cholesterol, fastingbs, restingecg, maxhr, exerciseangina, oldpeak, st_slope]])
-            pred = model.predict(X)
-            proba = model.predict_proba(X)[0]
-            confidence = max(proba) * 100
+            # Encoding memakai encoder.py supaya sama persis dengan encoding saat training
+            values = {'Age': age, 'Sex': sex, 'ChestPainType': chestpain, 'RestingBP': restingbp,
+                      'Cholesterol': cholesterol, 'FastingBS': fastingbs, 'RestingECG': restingecg,
+                      'MaxHR': maxhr, 'ExerciseAngina': exerciseangina, 'Oldpeak': oldpeak, 'ST_Slope': st_slope}
+            # Probabilitas dan kontribusi setiap feature (SHAP) didapat dari satu panggilan model,
+            # atau langsung dari cache jika input yang sama sudah pernah diprediksi
+            with timer('form_predict'):
+                X = encode_form(values)
+                proba, contributions, _ = explain(get_model_entry(), X)
+            pred = int(proba[0] > 0.5)
+            confidence = max(proba[0], 1 - proba[0]) * 100
             if pred == 0:
                 font_color = 'green'
                 st.markdown(f"<h3>You <span style='color: {font_color}'>do not have a heart disease</span></h3>", unsafe_allow_html=True)
@@ -103,4 +79,38 @@ def show_predict():
                 
             st.markdown(f"<h4>Confidence: <span style='color: {font_color}'>{confidence:.2f}%</span></h4>", unsafe_allow_html=True)
 
-show_predict()
\ No newline at end of file
+            with st.expander('🔍 Faktor yang paling memengaruhi prediksi ini'):
+                st.write('Kontribusi positif menaikkan risiko penyakit jantung, kontribusi negatif menurunkan risiko (SHAP value).')
+                st.table(contribution_table([values[col] for col in FEATURE_NAMES], contributions[0]))
+
+            # Profil disimpan untuk mode what-if
+            st.session_state['what_if_profile'] = X[0].tolist()
+
+# Mode what-if: probabilitas untuk setiap nilai slider sudah dihitung sekaligus (risk surface),
+# sehingga menggeser slider di bawah ini tidak memanggil model lagi
+def show_what_if():
+    profile = st.session_state.get('what_if_profile')
+    if profile is None:
+        return
+
+    st.subheader('🔀 What-if')
+    st.write('Lihat bagaimana risiko berubah jika satu nilai diubah, sementara nilai lain tetap sama dengan input terakhir Anda.')
+
+    surface, version = risk_surfaces.get(profile)
+    col = st.selectbox('Nilai yang ingin diubah', list(WHAT_IF_LABELS), format_func=lambda c: WHAT_IF_LABELS[c])
+    values, _ = surface[col]
+    current = int(profile[FEATURE_NAMES.index(col)])
+    value = st.select_slider(WHAT_IF_LABELS[col], options=values, value=current, key=f'what_if_{col}')
+
+    base = lookup(surface, col, current)
+    proba = lookup(surface, col, value)
+    st.metric('Probabilitas penyakit jantung', f'{proba * 100:.2f}%', delta=f'{(proba - base) * 100:+.2f}%', delta_color='inverse')
+
+    png = sensitivity_figures.get_or_render(('what_if', col, tuple(profile)), version, lambda: draw_sensitivity(surface, col, current))
+    st.image(png)
+
+# Export metrics ke file jika HEART_METRICS_FILE diisi
+start_file_exporter()
+
+show_predict()
+show_what_if()
\ No newline at end of file